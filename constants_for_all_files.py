@@ -40,4 +40,100 @@ sim_state = 0 # 0 = Setup, 1 = Running, 0.5 = Paused
 # after effects and trails
 
 TRAIL_LENGTH = 40   # How many "ghosts" to keep
-TRAIL_SKIP = 2      # Record position every N frames (Optimization)
\ No newline at end of file
+TRAIL_SKIP = 2      # Record position every N frames (Optimization)
+TRAIL_MODE = "layer"     # "layer" (one persistent layer, faded per stamp) or "history" (ring buffer of past positions); trails.py
+TRAIL_STYLE = "dots"     # "dots" or "polyline"
+TRAIL_LINE_WIDTH = 3     # "polyline" segment width (px)
+TRAIL_HISTORY_LENGTH = 1000  # "history" mode: points kept per particle (thousands are fine, see TRAIL_LOD_PX)
+TRAIL_LOD_PX = 4         # "history" mode: drawn points are at least this far apart along the trail (px)
+TRAIL_MAX_POINTS = 8000  # "history" mode: rough cap on trail points drawn per frame (LOD step widens past it)
+TRAIL_FADE_BANDS = 8     # "history" polyline: alpha steps along the trail (one line per step)
+# energy diagnostics
+
+ENERGY_SAMPLE_EVERY = 1             # Sample energy (and apply the elastic correction) every k physics steps
+ENERGY_HISTORY_CAPACITY = 4096      # Rows kept in the long-run KE/PE/total ring buffer
+ENERGY_HISTORY_DECIMATION = 16      # Samples averaged into each history row
+
+# frame profiling
+
+PROFILER_WINDOW = 120           # Frames in the rolling mean / p99 shown by the overlay
+PROFILER_HISTORY = 3600         # Frames kept for CSV / Chrome-trace export
+PROFILER_FRAME_EVENTS = 512     # Trace events kept per frame (turbo / many substeps: the rest only count in the totals)
+PROFILER_OVERLAY_KEY = pygame.K_F3  # Toggle the timing overlay
+PROFILER_EXPORT_KEY = pygame.K_F5   # Write free1105_profile_<time>.csv / .json
+
+# telemetry (replaces the per-frame particle print)
+
+TELEMETRY_RATE_HZ = 10          # Particle-state snapshots per second (0 = off)
+TELEMETRY_VERBOSITY = 1         # 0 = quiet, 1 = console summaries, 2 = summaries + per-particle lines
+TELEMETRY_SUMMARY_SECONDS = 2.0 # Console summary interval
+TELEMETRY_CAPACITY = 65536      # Records kept in the in-memory ring buffer
+TELEMETRY_PATH = None           # e.g. "telemetry.bin" to also append records to a file
+TELEMETRY_VERBOSITY_KEY = pygame.K_F6  # Cycle console verbosity 0 -> 1 -> 2 -> 0
+
+# physics in a separate process (physics_process.py)
+
+PHYSICS_IN_PROCESS = False          # True = simulate in a child process, render loop only draws snapshots
+PHYSICS_PROCESS_CAPACITY = 1024     # Particles the shared snapshot holds (grows automatically on START)
+PHYSICS_PROCESS_PUBLISH_HZ = 240    # Max snapshot publishes per second
+
+# fixed-timestep scheduling (timestep.py)
+
+SIM_REAL_TIME_FACTOR = 0.1      # Simulated seconds per real second (0.1 = the old 100 FPS x dt 1/1000)
+MAX_SUBSTEPS_PER_FRAME = 64     # Cap on physics steps per rendered frame (backlog beyond it is dropped)
+MAX_FRAME_SECONDS = 0.25        # Longest wall-clock frame the accumulator will honour
+TURBO_KEY = pygame.K_F7         # Toggle turbo: physics flat out, render every Nth loop iteration
+TURBO_RENDER_EVERY = 10         # In turbo, draw one loop iteration in N
+TURBO_STEP_BUDGET_MS = 50       # In turbo, wall time spent stepping per loop iteration
+
+# potential heatmap (electric_field.py)
+
+HEATMAP_BLOCK_SIZE = 8                  # Charges evaluated per float32 kernel block
+HEATMAP_INCREMENTAL = True              # Only redo charges that moved (e.g. dragging in setup)
+HEATMAP_INCREMENTAL_MAX_MOVED = 4       # More movers than this -> full recompute
+HEATMAP_INCREMENTAL_REFRESH = 120       # Full recompute after this many incremental updates (float32 drift)
+HEATMAP_MODE = "auto"                   # "direct", "fft" (charge deposit + FFT convolution), "quadtree" or "auto"
+HEATMAP_FFT_MIN_CHARGES = 400           # "auto" switches to the FFT path from this many charges
+HEATMAP_FFT_RADIUS_STEP = 2.0           # r_min clamp quantisation (px) for the cached FFT kernels
+HEATMAP_WORKERS = 4                     # Row tiles computed in parallel (threads; 1 = no pool)
+HEATMAP_BACKGROUND = True               # Compute off the render loop, blitting the last finished frame
+
+# Adaptive heatmap resolution
+HEATMAP_ADAPTIVE = True                 # Let the frame time pick the heatmap grid resolution
+HEATMAP_DIVISORS = (4, 6, 8, 12, 16)    # Grid = screen // divisor per level; level 0 (SW//4 = V_SW) is full quality
+HEATMAP_FRAME_BUDGET_MS = 1000 / 60     # Go coarser while the smoothed frame time is above this
+HEATMAP_HEADROOM = 0.6                  # ... and finer after a while below this fraction of it
+HEATMAP_RESOLUTION_HOLD = 30            # Frames between level changes / of headroom before refining
+HEATMAP_IDLE_FRAMES = 15                # Unchanged frames before an idle scene is drawn at full quality
+HEATMAP_QUADTREE_CELL = 16              # "quadtree" mode: coarse cell size in grid nodes (power of 2)
+HEATMAP_REFINE_TOL = 0.5                # ... refine while the bilinear error could exceed this many grey levels
+
+# Frame-budget scheduler
+FRAME_BUDGET_MS = 1000 / 60             # Frame budget (ms); the FPS slider can only make it longer
+SCHEDULER_SMOOTHING = 0.1               # Weight of the newest sample in each task's cost average
+SCHEDULER_MAX_SKIP = 10                 # A deferred task runs anyway after this many skipped frames
+SCHEDULER_MAX_STRIDE = 8                # Coarsest degradation for stride-able tasks (trails)
+
+# State bus
+STATE_BUS_CAPACITY = 256                # Initial rows of the particle state bus (grows on demand)
+
+# Phase 4 (3D potential surface)
+PHASE4_MODE = "embedded"                # "embedded" (NumPy renderer in this window), "process" (matplotlib child process), "thread"
+PHASE4_KEY = pygame.K_F4                # Open / close the 3D view (nothing of it is loaded before the first press)
+SURFACE_VIEW_RECT = (1110, 540, 370, 280)   # Embedded viewport (x, y, w, h), bottom right, above the buttons
+SURFACE_VIEW_GRID = 40                  # NxN mesh points
+SURFACE_VIEW_ORBIT_SPEED = 0.01         # Radians of orbit per pixel dragged
+SURFACE_VIEW_HEIGHT = 0.25              # Peak height of the surface (screen width = 1)
+SURFACE_VIEW_DISTANCE = 3.0             # Camera distance for the perspective divide
+SURFACE_VIEW_AMBIENT = 0.45             # Unlit share of the shading
+SURFACE_VIEW_BG = (26, 26, 46)
+SURFACE_VIEW_WIRE = (0, 110, 170)
+COL_POS_MARKER = (255, 51, 51)
+COL_NEG_MARKER = (51, 51, 255)
+COL_NEUTRAL_MARKER = (136, 136, 136)
+
+# GUI text
+TEXT_CACHE_SIZE = 256                   # Rendered text surfaces kept by gui.render_text (LRU)
+
+# Particle sprites
+SPRITE_COLORKEY = (255, 0, 255)         # Transparent colour of the pre-rendered particle sprites (never a particle colour)
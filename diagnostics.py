@@ -0,0 +1,122 @@
+# below is diagnostics.py
+
+# necessary imports
+
+import numpy as np
+from constants_for_all_files import *
+
+# Energy bookkeeping for the PhysicsEngine:
+# - samples KE / PE every `sample_every` steps (PE comes free from the force kernel)
+# - restores the initial total energy for perfectly elastic systems (velocity rescale)
+# - keeps a downsampled, fixed-size history so long runs don't grow memory
+
+class EnergyHistory:
+    """
+    Ring buffer of rows (step, KE, PE, total).
+    Every `decimation` samples are averaged into one row, so `capacity` rows cover
+    capacity * decimation samples before the oldest rows get overwritten.
+    """
+
+    def __init__(self, capacity=ENERGY_HISTORY_CAPACITY, decimation=ENERGY_HISTORY_DECIMATION):
+        self.capacity = int(capacity)
+        self.decimation = max(1, int(decimation))
+        self.data = np.zeros((self.capacity, 4), dtype=float)
+        self.clear()
+
+    def clear(self):
+        self.head = 0    # next row to write
+        self.count = 0   # rows holding valid data
+        self._acc = np.zeros(4, dtype=float)
+        self._acc_n = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, step, kinetic_energy, potential_energy):
+        self._acc += (step, kinetic_energy, potential_energy, kinetic_energy + potential_energy)
+        self._acc_n += 1
+        if self._acc_n < self.decimation:
+            return
+        self.data[self.head] = self._acc / self._acc_n
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self._acc[:] = 0.0
+        self._acc_n = 0
+
+    def as_array(self):
+        """Copy of the stored rows, oldest first (shape (count, 4))."""
+        if self.count < self.capacity:
+            return self.data[:self.count].copy()
+        return np.roll(self.data, -self.head, axis=0)
+
+
+class EnergyDiagnostics:
+    """
+    Owned by PhysicsEngine (engine.diagnostics). Call begin() when the simulation starts,
+    after_step() once per physics step (PhysicsEngine.step does this) and reset() on RESET.
+    """
+
+    def __init__(self, sample_every=ENERGY_SAMPLE_EVERY, correct_energy=True, tolerance=1e-6,
+                 history_capacity=ENERGY_HISTORY_CAPACITY, history_decimation=ENERGY_HISTORY_DECIMATION):
+        self.sample_every = max(1, int(sample_every))
+        self.correct_energy = correct_energy
+        self.tolerance = tolerance
+        self.history = EnergyHistory(history_capacity, history_decimation)
+        self.reset()
+
+    def reset(self):
+        self.initial_total_energy = None
+        self.kinetic_energy = 0.0
+        self.potential_energy = 0.0
+        self.step_count = 0
+        self.last_scale_factor = 1.0
+        self.history.clear()
+
+    def begin(self, kinetic_energy, potential_energy):
+        """Record the reference energy the elastic correction restores to."""
+        self.reset()
+        self.kinetic_energy = float(kinetic_energy)
+        self.potential_energy = float(potential_energy)
+        self.initial_total_energy = self.kinetic_energy + self.potential_energy
+        self.history.push(0, self.kinetic_energy, self.potential_energy)
+
+    @property
+    def total_energy(self):
+        return self.kinetic_energy + self.potential_energy
+
+    def after_step(self, engine, wall_cor):
+        """
+        Counts a step and, every `sample_every` steps, samples the energy of engine.store
+        (already bound to the particles by the integrator), applies the elastic correction
+        and appends to the history. Returns True if this step was sampled.
+        """
+        self.step_count += 1
+        if self.step_count % self.sample_every:
+            return False
+
+        store = engine.store
+        pe = engine.settled_potential_energy()  # matches the post-collision positions
+        if pe is None:
+            return False
+        ke = engine.kinetic_energy(store.velocities, store.masses)
+
+        # Energy correction only if all collisions are perfectly elastic (every e == 1 and wall_cor == 1)
+        all_elastic = wall_cor == 1.0 and bool(np.all(store.e == 1.0))
+        if self.correct_energy and all_elastic and self.initial_total_energy is not None:
+            ke = self._rescale(engine, store, ke, pe)
+
+        self.kinetic_energy = ke
+        self.potential_energy = float(pe)
+        self.history.push(self.step_count, ke, self.potential_energy)
+        return True
+
+    def _rescale(self, engine, store, ke, pe):
+        # Only correct if there's actually kinetic energy to scale
+        if ke <= 1e-10 or abs(ke + pe - self.initial_total_energy) <= self.tolerance:
+            self.last_scale_factor = 1.0
+            return ke
+        scale_factor = np.sqrt(max(0.0, (self.initial_total_energy - pe) / ke))
+        # one array operation over every non-static particle (rows are shared with the objects)
+        store.velocities[store.dynamic] *= scale_factor
+        self.last_scale_factor = scale_factor
+        return engine.kinetic_energy(store.velocities, store.masses)
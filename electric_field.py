@@ -2,64 +2,585 @@
 
 # necessary imports
 
+import os
+import time
 import pygame
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from constants_for_all_files import *
+from particle_store import SceneCache
 
 # Electric Field Calculation and Visualization
 
+# 256-entry colour lookup table: field level -> RGB (neutral grey at 127, the same greys as before)
+
+HEATMAP_LUT = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+
+
+class ResolutionGovernor:
+    """
+    Picks the heatmap grid level (0 = finest) from the measured frame time: one level coarser
+    when the smoothed frame time is over budget, one level finer after `hold` frames with
+    headroom, and full quality once the scene has been idle for `idle_frames` frames.
+    """
+
+    def __init__(self, n_levels, budget_ms=HEATMAP_FRAME_BUDGET_MS, headroom=HEATMAP_HEADROOM,
+                 hold=HEATMAP_RESOLUTION_HOLD, idle_frames=HEATMAP_IDLE_FRAMES):
+        self.n_levels = n_levels
+        self.budget = budget_ms / 1000.0
+        self.headroom = headroom
+        self.hold = hold
+        self.idle_frames = idle_frames
+        self.level = 0
+        self.frame_time = None    # exponential moving average (s)
+        self._last = None
+        self._calm = 0            # consecutive frames with headroom
+        self._cooldown = 0        # frames to wait after a level change before judging again
+        self._idle = 0
+
+    def tick(self, changed, busy_ms=None):
+        """
+        Call once per rendered frame; returns the level to render at. `busy_ms` is the work time of
+        the previous frame without the FPS-cap sleep (pygame's Clock.get_rawtime()); without it the
+        interval between calls is used.
+        """
+        now = time.perf_counter()
+        if busy_ms is not None:
+            dt = busy_ms / 1000.0
+        else:
+            dt = None if self._last is None else now - self._last
+        self._last = now
+        if dt is not None and dt < MAX_FRAME_SECONDS:  # ignore stalls (window drags, breakpoints ...)
+            self.frame_time = dt if self.frame_time is None else 0.9 * self.frame_time + 0.1 * dt
+        self._idle = 0 if changed else self._idle + 1
+
+        if self._cooldown:
+            self._cooldown -= 1
+        elif self.frame_time is not None:
+            if self.frame_time > self.budget:
+                self._calm = 0
+                if self.level < self.n_levels - 1:
+                    self._change(self.level + 1)
+            elif self.frame_time < self.budget * self.headroom:
+                self._calm += 1
+                if self._calm >= self.hold and self.level > 0:
+                    self._change(self.level - 1)
+            else:
+                self._calm = 0
+
+        return 0 if self._idle >= self.idle_frames else self.level
+
+    def _change(self, level):
+        # the old average describes the old resolution
+        self.level = level
+        self.frame_time = None
+        self._calm = 0
+        self._cooldown = self.hold
+
+
+# per-level state swapped in and out by ElectricFieldSystem._set_level
+_LEVEL_BUFFERS = ('x_coords', 'y_coords', 'grid_x', 'grid_y', 'surface', '_lut_mapped', '_mapped',
+                  '_xs32', '_ys32', '_front', '_back', '_front_index', '_back_index', '_norm', '_tiles')
+
+
 class ElectricFieldSystem:
 
-    def __init__(self):
+    def __init__(self, block_size=HEATMAP_BLOCK_SIZE, incremental=HEATMAP_INCREMENTAL, mode=HEATMAP_MODE,
+                 workers=HEATMAP_WORKERS, background=HEATMAP_BACKGROUND, adaptive=HEATMAP_ADAPTIVE):
+
+        self.block_size = block_size
+        self._n_tiles = max(1, int(workers or os.cpu_count() or 1))
+
+        # full-screen scaled copy of the heatmap, persistent; re-blitted while the scene is unchanged
+        # (created with the grid surface's 32-bit format in _set_level)
+
+        self._scaled_view = None
+        self._presented = False
+        self._scene = SceneCache()
+        self._dirty = True
+
+        # the 256-entry colour LUT; pre-mapped to packed pixel values in _set_level
+
+        self.lut = HEATMAP_LUT
+
+        # incremental mode: remember what the field currently holds so only moved charges are redone
+
+        self.incremental = incremental
+        self._members = []        # charge objects the field was built from (identity, in order)
+        self._params = None       # (N,4) float64 [x, y, k*q / q_scale, r_min^2] per charge
+        self._q_scale = 0.0
+        self._incremental_updates = 0
+
+        # "direct" (per-charge kernel), "fft" (deposit + convolution, cost independent of N),
+        # "quadtree" (coarse grid refined where needed, then interpolated)
+        # or "auto" (fft from HEATMAP_FFT_MIN_CHARGES charges up)
+
+        self.mode = mode
+        self._fft_kernels = {}    # (grid shape, quantised r_min) -> rfft2 of the clamped 1/r^2 kernel
+        self.last_evaluations = 0 # exact field evaluations of the last quadtree pass
+
+        # grid resolution: level i is a (SW // HEATMAP_DIVISORS[i]) x (SH // HEATMAP_DIVISORS[i]) grid,
+        # level 0 being full quality; the governor picks the level from the frame time
+
+        self.adaptive = adaptive
+        self.governor = ResolutionGovernor(len(HEATMAP_DIVISORS))
+
+        # grids, surfaces, buffers and thread pools are only built once there is something to draw
+        # (see _ensure_grid): an empty scene is a plain fill and costs nothing at startup
+
+        self.level = None
+        self._levels = {}          # level -> its grid / surface / buffers, built on first use and kept
+        self._tiles = []
+        self._tile_pool = None
+        self.background = background
+        self._job_pool = None
+        self._job = None
+
+    def _ensure_grid(self):
+        if self.level is not None:
+            return
+        self._set_level(0)
+
+        # row tiles can run on a thread pool -- numpy / BLAS release the GIL
+
+        if len(self._tiles) > 1:
+            self._tile_pool = ThreadPoolExecutor(len(self._tiles), thread_name_prefix="heatmap-tile")
+
+        # background mode: one coordinator thread runs whole compute + colourise jobs
+
+        if self.background:
+            self._job_pool = ThreadPoolExecutor(1, thread_name_prefix="heatmap")
+
+    def _set_level(self, level):
+        """Switch to the grid / buffers of `level`. Never called while a job is running."""
+        # the governor flips between levels all the time (idle <-> full quality): every level's
+        # buffers are built once and kept, so a switch is a few attribute swaps, not reallocation
+        if self.level is not None:
+            self._levels[self.level] = {name: getattr(self, name) for name in _LEVEL_BUFFERS}
+        self.level = level
+        buffers = self._levels.get(level)
+        if buffers is None:
+            self._build_level(level)
+        else:
+            for name, value in buffers.items():
+                setattr(self, name, value)
+        self.field = self._front
+
+        # the field no longer holds anything usable
+        self._params = None
+        self._members = []
+        self._dirty = True
+
+    def _build_level(self, level):
+        """Build everything that depends on the grid size of `level`."""
+        divisor = HEATMAP_DIVISORS[level]
+        W, H = SW // divisor, SH // divisor
 
         # sets up the virtual grid
 
-        self.x_coords = np.linspace(0, SW, V_SW)
-        self.y_coords = np.linspace(0, SH, V_SH)
+        self.x_coords = np.linspace(0, SW, W)
+        self.y_coords = np.linspace(0, SH, H)
         self.grid_x, self.grid_y = np.meshgrid(self.x_coords, self.y_coords)
-        
-        # surface to hold the heatmap
 
-        self.surface = pygame.Surface((V_SW, V_SH))
+        # surface to hold the heatmap (written through a pixels2d view), 32-bit like the scaled copy
 
-    def render(self, target_surface, charges):
+        self.surface = pygame.Surface((W, H), 0, 32)
+        if self._scaled_view is None:
+            self._scaled_view = pygame.Surface((SW, SH), 0, self.surface)
+        self._lut_mapped = np.array([self.surface.map_rgb(tuple(c)) for c in self.lut], dtype=np.uint32)
+        self._mapped = np.empty((H, W), dtype=np.uint32)
 
-        if not charges:
-            target_surface.fill(BGC)
-            return
+        # float32 field, double buffered: the main loop shows the front buffer while a
+        # background job fills the back one (self.field is whichever was computed into last)
 
-        # Calculate the electric field at each grid point due to all charges
+        self._xs32 = self.x_coords.astype(np.float32)
+        self._ys32 = self.y_coords.astype(np.float32)
+        self._front = np.zeros((H, W), dtype=np.float32)
+        self._back = np.zeros((H, W), dtype=np.float32)
+
+        # LUT indices (one uint8 per grid point) per buffer, plus float scratch for the normalisation
+
+        self._front_index = np.zeros((H, W), dtype=np.uint8)
+        self._back_index = np.zeros((H, W), dtype=np.uint8)
+        self._norm = np.empty((H, W), dtype=np.float32)
+
+        # the grid is split into horizontal tiles (row ranges), each with its own kernel buffers
+        # (dx^2 is (block, W), dy^2 is (block, rows); r^2 for a block of charges is their outer sum)
+
+        B = self.block_size
+        edges = np.linspace(0, H, min(self._n_tiles, H) + 1).astype(int)
+        self._tiles = []
+        for r0, r1 in zip(edges[:-1], edges[1:]):
+            rows = r1 - r0
+            self._tiles.append({
+                'rows': (r0, r1),
+                'block': np.empty((B, rows, W), dtype=np.float32),
+                'block_sum': np.empty(rows * W, dtype=np.float32),
+                'dx2': np.empty((B, W), dtype=np.float32),
+                'dy2': np.empty((B, rows), dtype=np.float32),
+            })
+
+    # --- kernel ---
+
+    def _accumulate(self, params, sign=1.0):
+        """field += sign * sum over charges of (k q / q_scale) / max(r^2, r_min^2), one task per tile."""
+        params32 = params.astype(np.float32)
+        if self._tile_pool is None:
+            self._accumulate_tile(self._tiles[0], params32, sign)
+        else:
+            # list() waits for every tile (and re-raises any worker exception)
+            list(self._tile_pool.map(lambda tile: self._accumulate_tile(tile, params32, sign), self._tiles))
+
+    def _accumulate_tile(self, tile, params32, sign):
+        """The kernel for rows r0:r1 of the field, blocked over charges."""
+        r0, r1 = tile['rows']
+        out = self.field[r0:r1]
+        ys = self._ys32[r0:r1]
+        sign = np.float32(sign)
+        B = self.block_size
+        for start in range(0, len(params32), B):
+            p = params32[start:start + B]
+            b = len(p)
+            dx2 = tile['dx2'][:b]
+            dy2 = tile['dy2'][:b]
+            block = tile['block'][:b]
+            np.subtract(self._xs32[None, :], p[:, 0:1], out=dx2)
+            np.square(dx2, out=dx2)
+            np.subtract(ys[None, :], p[:, 1:2], out=dy2)
+            np.square(dy2, out=dy2)
+            np.add(dy2[:, :, None], dx2[:, None, :], out=block)
+            np.maximum(block, p[:, 3, None, None], out=block)   # cap minimum distance (also avoids r = 0)
+            np.reciprocal(block, out=block)
+            # weighted sum over the block's charges as one BLAS matrix-vector product
+            np.dot(p[:, 2] * sign, block.reshape(b, -1), out=tile['block_sum'])
+            out += tile['block_sum'].reshape(out.shape)
 
-        net_field = np.zeros_like(self.grid_x, dtype=float)
+    def _gather(self, charges):
+        n = len(charges)
+        params = np.empty((n, 4), dtype=float)
+        for i, pc in enumerate(charges):
+            params[i, 0] = pc.position[0]
+            params[i, 1] = pc.position[1]
+            params[i, 2] = K_COULOMB * pc.charge
+            params[i, 3] = max(pc.total_radius ** 2, E_CHARGE)
+        return params
 
-        for pc in charges:
-            dx = self.grid_x - pc.position[0]
-            dy = self.grid_y - pc.position[1]
-            r2 = dx**2 + dy**2
-            r2[r2 == 0] = E_CHARGE # Prevent division by zero
-            min_distance = pc.total_radius ** 2
-            r2[r2 < min_distance] = min_distance # Cap minimum distance squared to avoid extreme values
+    # --- FFT convolution ---
 
-            contribution = (K_COULOMB * pc.charge) / r2
-            net_field += contribution
+    def _fft_shape(self):
+        # zero padding to (2H, 2W) makes the circular convolution equal the linear one on the grid
+        H, W = self.field.shape
+        return 2 * H, 2 * W
+
+    def _fft_kernel(self, r_min):
+        """rfft2 of 1 / max(r^2, r_min^2) sampled at every grid offset (wrap-around order), cached per r_min."""
+        key = (self.field.shape, r_min)
+        kernel_f = self._fft_kernels.get(key)
+        if kernel_f is not None:
+            return kernel_f
+        H, W = self.field.shape
+        PH, PW = self._fft_shape()
+        hx = self.x_coords[1] - self.x_coords[0]
+        hy = self.y_coords[1] - self.y_coords[0]
+        # offsets 0..P/2 then negative ones: index k <-> k for k < P/2, k - P otherwise
+        oy = np.fft.fftfreq(PH, 1.0 / PH) * hy
+        ox = np.fft.fftfreq(PW, 1.0 / PW) * hx
+        r2 = oy[:, None] ** 2 + ox[None, :] ** 2
+        kernel = 1.0 / np.maximum(r2, max(r_min * r_min, E_CHARGE))
+        kernel_f = np.fft.rfft2(kernel)
+        self._fft_kernels[key] = kernel_f
+        return kernel_f
+
+    def _deposit(self, params, shape):
+        """Cloud-in-cell: spread each (scaled) charge over its 4 surrounding grid nodes."""
+        H, W = self.field.shape
+        gx = params[:, 0] / (self.x_coords[1] - self.x_coords[0])
+        gy = params[:, 1] / (self.y_coords[1] - self.y_coords[0])
+        ix = np.floor(gx).astype(np.int64)
+        iy = np.floor(gy).astype(np.int64)
+        fx = gx - ix
+        fy = gy - iy
+        q = params[:, 2]
+        grid = np.zeros(shape[0] * shape[1], dtype=float)
+        for ox, oy, w in ((0, 0, (1 - fx) * (1 - fy)), (1, 0, fx * (1 - fy)),
+                          (0, 1, (1 - fx) * fy), (1, 1, fx * fy)):
+            cx = ix + ox
+            cy = iy + oy
+            inside = (cx >= 0) & (cx < W) & (cy >= 0) & (cy < H)
+            grid += np.bincount(cy[inside] * shape[1] + cx[inside], weights=(q * w)[inside],
+                                minlength=grid.size)
+        return grid.reshape(shape)
+
+    def _compute_fft(self, params):
+        """Field from charge deposits convolved with the cached kernels: O(G log G) for any N.
+        Charges are grouped by r_min (quantised to HEATMAP_FFT_RADIUS_STEP px) so each group
+        gets the clamp matching its total_radius; groups are summed in frequency space."""
+        H, W = self.field.shape
+        shape = self._fft_shape()
+        step = HEATMAP_FFT_RADIUS_STEP
+        r_bins = np.maximum(np.round(np.sqrt(params[:, 3]) / step), 1) * step
+        spectrum = None
+        for r_min in np.unique(r_bins):
+            members = params[r_bins == r_min]
+            term = np.fft.rfft2(self._deposit(members, shape)) * self._fft_kernel(float(r_min))
+            spectrum = term if spectrum is None else spectrum + term
+        self.field[:] = np.fft.irfft2(spectrum, s=shape)[:H, :W]
+        # the incremental bookkeeping no longer describes self.field
+        self._params = None
+        return self.field
+
+    def _use_fft(self, n):
+        return self.mode == "fft" or (self.mode == "auto" and n >= HEATMAP_FFT_MIN_CHARGES)
+
+    # --- quadtree refinement ---
+
+    def _eval_points(self, xs, ys, params, with_clearance=False, chunk=2048):
+        """
+        Exact field at arbitrary points (float32, reciprocal + BLAS like the direct kernel). With
+        `with_clearance`, also each point's smallest (distance to a charge - that charge's r_min),
+        i.e. how far it is from any clamped core.
+        """
+        p = params.astype(np.float32)
+        r_min = np.sqrt(p[:, 3])
+        values = np.empty(len(xs), dtype=np.float32)
+        clearance = np.empty(len(xs), dtype=np.float32) if with_clearance else None
+        for start in range(0, len(xs), chunk):
+            px = xs[start:start + chunk, None].astype(np.float32)
+            py = ys[start:start + chunk, None].astype(np.float32)
+            r2 = np.subtract(px, p[None, :, 0])
+            np.square(r2, out=r2)
+            dy2 = np.subtract(py, p[None, :, 1])
+            np.square(dy2, out=dy2)
+            r2 += dy2
+            if with_clearance:
+                np.sqrt(r2, out=dy2)
+                dy2 -= r_min[None, :]
+                clearance[start:start + chunk] = dy2.min(axis=1)
+            np.maximum(r2, p[None, :, 3], out=r2)
+            np.reciprocal(r2, out=r2)
+            np.dot(r2, p[:, 2], out=values[start:start + chunk])
+        return values, clearance
+
+    def _compute_quadtree(self, params):
+        """
+        Evaluate on every HEATMAP_QUADTREE_CELL-th grid node, then split cells in four while the
+        field is not close to bilinear inside them (centre value vs corner average, tolerance in
+        grey levels of the final heatmap) or a charge's core reaches into them. Leaf cells are
+        filled by bilinear interpolation of their corners; every evaluated node keeps its exact value.
+        """
+        H, W = self.field.shape
+        S = HEATMAP_QUADTREE_CELL
+        hx = self.x_coords[1] - self.x_coords[0]
+        hy = self.y_coords[1] - self.y_coords[0]
+
+        # node grid padded to whole cells (a few nodes past the screen edge, cropped at the end)
+        Hp = -(-(H - 1) // S) * S + 1
+        Wp = -(-(W - 1) // S) * S + 1
+        values = np.zeros((Hp, Wp))
+        known = np.zeros((Hp, Wp), dtype=bool)
+        evaluations = 0
+
+        def evaluate(rows, cols, with_clearance=False):
+            nonlocal evaluations
+            values[rows, cols], clearance = self._eval_points(cols * hx, rows * hy, params, with_clearance)
+            known[rows, cols] = True
+            evaluations += len(rows)
+            return clearance
+
+        # one grey level of the heatmap is max|field| / (0.7 * 127.5); the peak is at a charge core
+        peak = float(np.max(np.abs(params[:, 2]) / params[:, 3]))
+        tolerance = HEATMAP_REFINE_TOL * peak / (0.7 * 127.5)
+
+        rows, cols = np.mgrid[0:Hp:S, 0:Wp:S]
+        evaluate(rows.ravel(), cols.ravel())
+        r0, c0 = np.mgrid[0:Hp - 1:S, 0:Wp - 1:S]
+        r0, c0 = r0.ravel(), c0.ravel()
+        leaves = []
+        s = S
+        while s > 1 and len(r0):
+            h = s // 2
+            centre_clearance = evaluate(r0 + h, c0 + h, with_clearance=True)
+            corners = (values[r0, c0] + values[r0, c0 + s] + values[r0 + s, c0] + values[r0 + s, c0 + s]) / 4
+            half_diagonal = 0.5 * s * np.hypot(hx, hy)
+            refine = (np.abs(values[r0 + h, c0 + h] - corners) > tolerance) | (centre_clearance < half_diagonal)
+            leaves.append((s, r0[~refine], c0[~refine]))
+            r0, c0 = r0[refine], c0[refine]
+
+            # edge midpoints of the refined cells (shared between neighbours, so de-duplicated)
+            mid_r = np.concatenate([r0, r0 + h, r0 + s, r0 + h])
+            mid_c = np.concatenate([c0 + h, c0, c0 + h, c0 + s])
+            todo = np.unique(mid_r * Wp + mid_c)
+            todo = todo[~known.ravel()[todo]]
+            evaluate(todo // Wp, todo % Wp)
+
+            # four children each
+            r0 = np.concatenate([r0, r0, r0 + h, r0 + h])
+            c0 = np.concatenate([c0, c0 + h, c0, c0 + h])
+            s = h
+
+        # bilinear fill, biggest leaves first so finer cells overwrite the shared edges,
+        # then restore every exactly evaluated node
+        exact = values[known]
+        for size, lr, lc in leaves:
+            if not len(lr):
+                continue
+            t = np.arange(size + 1) / size
+            ty, tx = t[:, None], t[None, :]
+            v00 = values[lr, lc][:, None, None]
+            v01 = values[lr, lc + size][:, None, None]
+            v10 = values[lr + size, lc][:, None, None]
+            v11 = values[lr + size, lc + size][:, None, None]
+            block = (v00 * (1 - ty) * (1 - tx) + v01 * (1 - ty) * tx + v10 * ty * (1 - tx) + v11 * ty * tx)
+            offsets = np.arange(size + 1)
+            values[lr[:, None, None] + offsets[None, :, None], lc[:, None, None] + offsets[None, None, :]] = block
+        values[known] = exact
+
+        self.field[:] = values[:H, :W]
+        self.last_evaluations = evaluations
+        # the incremental bookkeeping no longer describes self.field
+        self._params = None
+        return self.field
+
+    def compute(self, charges):
+        """Update self.field for `charges` (full, incremental or FFT). The field is scaled by 1/max|k q|,
+        which leaves the normalised heatmap unchanged but keeps float32 well inside its range."""
+        self._ensure_grid()
+        return self._compute_params(self._gather(charges), charges)
+
+    def _compute_params(self, params, charges):
+        q_scale = float(np.max(np.abs(params[:, 2])))
+        if q_scale == 0:
+            q_scale = 1.0
+        params[:, 2] /= q_scale
+
+        if self._use_fft(len(params)):
+            return self._compute_fft(params)
+        if self.mode == "quadtree":
+            return self._compute_quadtree(params)
+
+        if self.incremental and self._can_update(charges, q_scale):
+            moved = np.any(params != self._params, axis=1)
+            n_moved = int(np.count_nonzero(moved))
+            if n_moved <= HEATMAP_INCREMENTAL_MAX_MOVED:
+                if n_moved:
+                    # take out the old contributions, put in the new ones
+                    self._accumulate(self._params[moved], sign=-1.0)
+                    self._accumulate(params[moved])
+                    self._incremental_updates += 1
+                self._params = params
+                return self.field
+
+        self.field.fill(0.0)
+        self._accumulate(params)
+        self._members = list(charges)
+        self._params = params
+        self._q_scale = q_scale
+        self._incremental_updates = 0
+        return self.field
+
+    def _can_update(self, charges, q_scale):
+        # same charges in the same order, same normalisation, and float32 drift still bounded
+        return (self._params is not None and charges == self._members and q_scale == self._q_scale
+                and self._incremental_updates < HEATMAP_INCREMENTAL_REFRESH)
+
+    def _colourise(self, net_field, index_out):
+        """Field -> LUT index per grid point, written into `index_out` (no temporaries)."""
 
         # colourises the heatmap based on field strength
 
-        max_val = np.max(np.abs(net_field))
+        max_val = float(max(net_field.max(), -net_field.min()))
         if max_val == 0:
             max_val = 100  # so eveything is neutral grey
 
-        normalised = 0.7 * net_field / max_val
-        pixel_vals = 127.5 - (normalised * 127.5)
-        pixel_vals = np.clip(pixel_vals, 0, 255).astype(np.uint8)
-        
-        # create RGB array for Pygame surface
+        # 127.5 - 0.7 * 127.5 * field / max, clipped to the LUT range and truncated like astype(uint8)
+        np.multiply(net_field, -0.7 * 127.5 / max_val, out=self._norm)
+        self._norm += 127.5
+        np.clip(self._norm, 0, 255, out=self._norm)
+        np.copyto(index_out, self._norm, casting='unsafe')
+        return index_out
 
-        pixels = np.dstack([pixel_vals] * 3)
-        pygame.surfarray.blit_array(self.surface, np.swapaxes(pixels, 0, 1))
-        
-        # scale up to full screen
+    def _present(self, index):
+        # LUT into a packed buffer, copied straight into the surface's pixels, then scaled into the
+        # persistent full-screen surface (main thread only: pygame surfaces; the pixels2d view locks
+        # the surface so it is dropped before scaling)
+        np.take(self._lut_mapped, index, out=self._mapped, mode='clip')
+        pixels = pygame.surfarray.pixels2d(self.surface)
+        pixels[...] = self._mapped.T
+        del pixels
+        pygame.transform.scale(self.surface, (SW, SH), self._scaled_view)
+        self._presented = True
+
+    # --- background double buffering ---
+
+    def _run_job(self, params, charges):
+        """Worker thread: compute into the back buffer (starting from the front buffer's state so
+        incremental updates stay valid) and colourise it."""
+        self._back[:] = self._front
+        self.field = self._back
+        self._compute_params(params, charges)
+        return self._colourise(self._back, self._back_index)
+
+    def _collect(self, wait=False):
+        """Swap in a finished background job, if there is one (the only work on the frame's critical path)."""
+        job = self._job
+        if job is None or not (wait or job.done()):
+            return
+        self._job = None
+        job.result()
+        self._front, self._back = self._back, self._front
+        self._front_index, self._back_index = self._back_index, self._front_index
+        self.field = self._front
+        self._present(self._front_index)
+
+    def close(self):
+        for pool in (self._job_pool, self._tile_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+    def render_cached(self, target_surface, charges):
+        """Re-blit the last heatmap without any work (the frame scheduler skipped this frame)."""
+        if not charges or not self._presented:
+            target_surface.fill(BGC)
+            return
+        target_surface.blit(self._scaled_view, (0, 0))
+
+    def render(self, target_surface, charges, busy_ms=None):
+
+        if not charges:
+            target_surface.fill(BGC)
+            return
+
+        self._ensure_grid()
+        changed = self._scene.needs_update(charges)
+        self._dirty |= changed
+        level = self.governor.tick(changed, busy_ms) if self.adaptive else 0
+
+        if self.background:
+            # show the last completed heatmap; start a new job when the scene (or the resolution)
+            # changed and the previous one has finished (only the very first frame waits for it)
+            self._collect()
+            if self._job is None:
+                if level != self.level:
+                    self._set_level(level)
+                if self._dirty:
+                    self._dirty = False
+                    self._job = self._job_pool.submit(self._run_job, self._gather(charges), list(charges))
+                    if not self._presented:
+                        self._collect(wait=True)
+            target_surface.blit(self._scaled_view, (0, 0))
+            return
+
+        if level != self.level:
+            self._set_level(level)
+
+        # nothing moved or changed since the last frame: reuse it
+
+        if not self._dirty and self._presented:
+            target_surface.blit(self._scaled_view, (0, 0))
+            return
+
+        # Calculate the electric field at each grid point due to all charges
 
-        scaled_view = pygame.transform.scale(self.surface, (SW, SH))
-        target_surface.blit(scaled_view, (0, 0))
-            
\ No newline at end of file
+        self._dirty = False
+        self._present(self._colourise(self.compute(charges), self._front_index))
+        target_surface.blit(self._scaled_view, (0, 0))
@@ -2,6 +2,7 @@
 
 import pygame
 import numpy as np
+from collections import OrderedDict
 from constants_for_all_files import *
 
 # --- UI CONFIGURATION ---
@@ -21,11 +22,40 @@ COL_FALSE_STD = (200, 50, 50)   # Red
 COL_POS = (200, 0, 0)   # Red
 COL_NEG = (0, 0, 200)   # Blue
 
+# --- SHARED FONTS & TEXT CACHE ---
+# SysFont looks the font up again on every call and most labels are the same few strings every frame,
+# so every widget shares one Font per (name, size, bold, italic), and rendered text is kept in an
+# LRU cache keyed by (font, text, colour). Cached surfaces are shared: blit them, never draw on them.
+
+_fonts = {}
+_text_cache = OrderedDict()
+
+def get_font(name, size, bold=False, italic=False):
+    """The one Font object for this face / size / style (created on first use)."""
+    key = (name, size, bold, italic)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size, bold=bold, italic=italic)
+    return font
+
+def render_text(font, text, colour, antialias=True):
+    """font.render(text, antialias, colour), rasterised once and reused until evicted."""
+    key = (font, text, tuple(colour), antialias)
+    surf = _text_cache.get(key)
+    if surf is None:
+        surf = font.render(text, antialias, colour)
+        _text_cache[key] = surf
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)  # least recently used
+    else:
+        _text_cache.move_to_end(key)
+    return surf
+
 class ResetButton:
     def __init__(self):
         # Bottom Left Placement
         self.rect = pygame.Rect(20, SH - 60, 100, 40)
-        self.font = pygame.font.SysFont('Arial', 20, bold=True)
+        self.font = get_font('Arial', 20, bold=True)
         self.hovered = False
 
     def handle_event(self, event):
@@ -36,12 +66,18 @@ class ResetButton:
                 return True
         return False
 
+    def ui_key(self):
+        return (tuple(self.rect), self.hovered)
+
+    def ui_bounds(self):
+        return self.rect
+
     def render(self, screen):
         color = (200, 50, 50) if self.hovered else (150, 50, 50)
         pygame.draw.rect(screen, color, self.rect)
         pygame.draw.rect(screen, (0,0,0), self.rect, 2)
         
-        text = self.font.render("RESET", True, (255, 255, 255))
+        text = render_text(self.font, "RESET", (255, 255, 255))
         text_rect = text.get_rect(center=self.rect.center)
         screen.blit(text, text_rect)
 
@@ -49,7 +85,7 @@ class StartButton:
     def __init__(self):
         # Placed next to ResetButton
         self.rect = pygame.Rect(1380, SH - 60, 100, 40)
-        self.font = pygame.font.SysFont('Roboto', 24, bold=True)
+        self.font = get_font('Roboto', 24, bold=True)
         self.hovered = False
         
     def handle_event(self, event):
@@ -60,13 +96,19 @@ class StartButton:
                 return True
         return False
 
+    def ui_key(self):
+        return (tuple(self.rect), self.hovered)
+
+    def ui_bounds(self):
+        return self.rect
+
     def render(self, screen):
         # Green Color for Start/Run
         color = (50, 150, 50) if self.hovered else (50, 100, 50)
         pygame.draw.rect(screen, color, self.rect)
         pygame.draw.rect(screen, (0,0,0), self.rect, 2)
         
-        text = self.font.render("START", True, (255, 255, 255))
+        text = render_text(self.font, "START", (255, 255, 255))
         text_rect = text.get_rect(center=self.rect.center)
         screen.blit(text, text_rect)
 
@@ -75,7 +117,7 @@ class PauseButton:
     def __init__(self):
         # Placed instead of StartButton
         self.rect = pygame.Rect(1380, SH - 60, 100, 40)
-        self.font = pygame.font.SysFont('Roboto', 24, bold=True)
+        self.font = get_font('Roboto', 24, bold=True)
         self.hovered = False
         
     def handle_event(self, event):
@@ -86,13 +128,19 @@ class PauseButton:
                 return True
         return False
 
+    def ui_key(self):
+        return (tuple(self.rect), self.hovered)
+
+    def ui_bounds(self):
+        return self.rect
+
     def render(self, screen):
         # Yellow Color for Pause
         color = (200, 200, 50) if self.hovered else (150, 150, 50)
         pygame.draw.rect(screen, color, self.rect)
         pygame.draw.rect(screen, (0,0,0), self.rect, 2)
         
-        text = self.font.render("PAUSE", True, (255, 255, 255))
+        text = render_text(self.font, "PAUSE", (255, 255, 255))
         text_rect = text.get_rect(center=self.rect.center)
         screen.blit(text, text_rect)
 
@@ -104,7 +152,7 @@ class UnpauseButton(PauseButton):
         pygame.draw.rect(screen, color, self.rect)
         pygame.draw.rect(screen, (0,0,0), self.rect, 2)
         self.rect = pygame.Rect(1380, SH - 60, 100, 40)
-        text = self.font.render("UNPAUSE", True, (255, 255, 255))
+        text = render_text(self.font, "UNPAUSE", (255, 255, 255))
         text_rect = text.get_rect(center=self.rect.center)
         screen.blit(text, text_rect)
 
@@ -116,7 +164,7 @@ class WallCORSlider:
         self.knob_radius = 8
         self.value = initial_value
         self.dragging = False
-        self.font = pygame.font.SysFont('Arial', 14)
+        self.font = get_font('Arial', 14)
         self.label = "Wall Bounce:"
         
     def handle_event(self, event):
@@ -135,6 +183,15 @@ class WallCORSlider:
             relative_x = event.pos[0] - self.slider_rect.x
             self.value = max(0.0, min(1.0, relative_x / self.slider_rect.width))
             
+    def ui_key(self):
+        return (tuple(self.slider_rect), self.value, self.dragging)
+
+    def ui_bounds(self):
+        # track + knob, and the value text to its right
+        bounds = self.slider_rect.inflate(2 * self.knob_radius + 2, 2 * self.knob_radius + 2)
+        w, h = self.font.size(f"{self.value:.2f}")
+        return bounds.union(pygame.Rect(self.slider_rect.right + 10, self.slider_rect.centery - 7, w, h))
+
     def render(self, screen):
         # Draw label
         #label_surf = self.font.render(self.label, True, (0, 0, 0))
@@ -156,7 +213,7 @@ class WallCORSlider:
         pygame.draw.circle(screen, (0, 0, 0), (int(knob_x), int(self.slider_rect.centery)), self.knob_radius, 2)
         
         # Draw value text
-        value_text = self.font.render(f"{self.value:.2f}", True, (0, 0, 0))
+        value_text = render_text(self.font, f"{self.value:.2f}", (0, 0, 0))
         screen.blit(value_text, (self.slider_rect.right + 10, self.slider_rect.centery - 7))
 
 class ContextMenu:
@@ -164,7 +221,7 @@ class ContextMenu:
         self.active = False
         self.pos = (0, 0)
         self.rect = pygame.Rect(0, 0, 160, 30)
-        self.font = pygame.font.SysFont('Arial', 16)
+        self.font = get_font('Arial', 16)
 
     def show(self, pos):
         self.active = True
@@ -181,11 +238,17 @@ class ContextMenu:
                 self.active = False # Clicked away
         return None
 
+    def ui_key(self):
+        return (self.active, tuple(self.rect))
+
+    def ui_bounds(self):
+        return self.rect if self.active else pygame.Rect(0, 0, 0, 0)
+
     def render(self, screen):
         if not self.active: return
         pygame.draw.rect(screen, (240, 240, 240), self.rect)
         pygame.draw.rect(screen, (0,0,0), self.rect, 1)
-        text = self.font.render("Create Charge", True, (0,0,0))
+        text = render_text(self.font, "Create Charge", (0,0,0))
         screen.blit(text, (self.rect.x + 10, self.rect.y + 5))
 
 # --- TEXT/TOGGLE COMPONENTS ---
@@ -196,7 +259,7 @@ class ScientificTextBox:
         self.rect = pygame.Rect(x, y, w, h)
         self.text = default_text
         self.active = False
-        self.font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
+        self.font = get_font(FONT_NAME, FONT_SIZE)
         
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -222,6 +285,12 @@ class ScientificTextBox:
         except ValueError:
             return None
 
+    def ui_key(self):
+        return (tuple(self.rect), self.text, self.active)
+
+    def ui_bounds(self):
+        return self.rect
+
     def render(self, screen):
         # Border color indicates focus
         color = COL_ACTIVE if self.active else COL_INACTIVE
@@ -229,7 +298,7 @@ class ScientificTextBox:
         pygame.draw.rect(screen, color, self.rect, 2)
         
         # Text rendering
-        text_surf = self.font.render(self.text, True, COL_TEXT)
+        text_surf = render_text(self.font, self.text, COL_TEXT)
         # Center text vertically
         text_rect = text_surf.get_rect(midleft=(self.rect.x + 5, self.rect.centery))
         screen.blit(text_surf, text_rect)
@@ -240,7 +309,7 @@ class MantissaTextBox:
         self.rect = pygame.Rect(x, y, w, h)
         self.text = default_text
         self.active = False
-        self.font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
+        self.font = get_font(FONT_NAME, FONT_SIZE)
         self.allow0 = False
         
     def handle_event(self, event):
@@ -279,12 +348,18 @@ class MantissaTextBox:
         except ValueError:
             return None
 
+    def ui_key(self):
+        return (tuple(self.rect), self.text, self.active)
+
+    def ui_bounds(self):
+        return self.rect
+
     def render(self, screen):
         color = COL_ACTIVE if self.active else COL_INACTIVE
         pygame.draw.rect(screen, (255, 255, 255), self.rect)
         pygame.draw.rect(screen, color, self.rect, 2)
         
-        text_surf = self.font.render(self.text, True, COL_TEXT)
+        text_surf = render_text(self.font, self.text, COL_TEXT)
         text_rect = text_surf.get_rect(midleft=(self.rect.x + 5, self.rect.centery))
         screen.blit(text_surf, text_rect)
 
@@ -294,7 +369,7 @@ class ExponentTextBox:
         self.rect = pygame.Rect(x, y, w, h)
         self.text = default_text
         self.active = False
-        self.font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
+        self.font = get_font(FONT_NAME, FONT_SIZE)
         
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -330,12 +405,18 @@ class ExponentTextBox:
         except ValueError:
             return None
 
+    def ui_key(self):
+        return (tuple(self.rect), self.text, self.active)
+
+    def ui_bounds(self):
+        return self.rect
+
     def render(self, screen):
         color = COL_ACTIVE if self.active else COL_INACTIVE
         pygame.draw.rect(screen, (255, 255, 255), self.rect)
         pygame.draw.rect(screen, color, self.rect, 2)
         
-        text_surf = self.font.render(self.text, True, COL_TEXT)
+        text_surf = render_text(self.font, self.text, COL_TEXT)
         text_rect = text_surf.get_rect(midleft=(self.rect.x + 5, self.rect.centery))
         screen.blit(text_surf, text_rect)
 
@@ -348,7 +429,7 @@ class BinaryToggle:
         self.rect = pygame.Rect(x, y, w, h)
         self.label = label
         self.state = initial_state
-        self.font = pygame.font.SysFont('Arial', 14, bold=True)
+        self.font = get_font('Arial', 14, bold=True)
         
         # Custom Configuration
         self.text_true = text_true
@@ -363,6 +444,15 @@ class BinaryToggle:
                 return True
         return False
 
+    def ui_key(self):
+        return (tuple(self.rect), self.state, self.label)
+
+    def ui_bounds(self):
+        if not self.label:
+            return self.rect
+        w, h = self.font.size(self.label)
+        return self.rect.union(pygame.Rect(self.rect.x, self.rect.y - 18, w, h))
+
     def render(self, screen):
         # Determine Color and Text based on state
         if self.state:
@@ -376,13 +466,13 @@ class BinaryToggle:
         pygame.draw.rect(screen, (0,0,0), self.rect, 2)
         
         # Status Text inside button
-        txt_surf = self.font.render(status_txt, True, (255,255,255))
+        txt_surf = render_text(self.font, status_txt, (255,255,255))
         txt_rect = txt_surf.get_rect(center=self.rect.center)
         screen.blit(txt_surf, txt_rect)
         
         # Label Text above button
         if self.label:
-            label_surf = self.font.render(self.label, True, (0,0,0))
+            label_surf = render_text(self.font, self.label, (0,0,0))
             screen.blit(label_surf, (self.rect.x, self.rect.y - 18))
 
 class TrailsToggle:
@@ -390,7 +480,7 @@ class TrailsToggle:
     def __init__(self, x=140, y=SH-60, w=100, h=40, initial_state=False):
         self.rect = pygame.Rect(x, y, w, h)
         self.state = initial_state
-        self.font = pygame.font.SysFont('Arial', 18, bold=True)
+        self.font = get_font('Arial', 18, bold=True)
         self.hovered = False
 
     def handle_event(self, event):
@@ -402,6 +492,12 @@ class TrailsToggle:
                 return True
         return False
 
+    def ui_key(self):
+        return (tuple(self.rect), self.state, self.hovered)
+
+    def ui_bounds(self):
+        return self.rect
+
     def render(self, screen):
         # Background: green when ON, red when OFF
         bg = (50, 200, 50) if self.state else (200, 50, 50)
@@ -412,7 +508,7 @@ class TrailsToggle:
         pygame.draw.rect(screen, (0,0,0), self.rect, 2)
 
         # White label centered
-        txt = self.font.render("TRAILS", True, (255, 255, 255))
+        txt = render_text(self.font, "TRAILS", (255, 255, 255))
         txt_rect = txt.get_rect(center=self.rect.center)
         screen.blit(txt, txt_rect)
 
@@ -448,6 +544,13 @@ class AngleWheel:
         # Pygame Y is down, so mathematical angle needs adjustment if we want standard trig
         self.angle = np.arctan2(dy, dx)   
         
+    def ui_key(self):
+        return (self.center, self.angle)
+
+    def ui_bounds(self):
+        return pygame.Rect(self.center[0] - self.radius - 2, self.center[1] - self.radius - 2,
+                           2 * self.radius + 4, 2 * self.radius + 4)
+
     def render(self, screen):
         # Update rect position in case center moved (e.g. when form moves)
         self.rect.topleft = (self.center[0] - self.radius, self.center[1] - self.radius)
@@ -465,7 +568,7 @@ class CreationForm:
         self.active = False
         self.rect = pygame.Rect(0, 0, 380, 500) # INCREASED HEIGHT to 500
         self.target_pos = (0,0)
-        self.font = pygame.font.SysFont('Arial', 16, bold=True)
+        self.font = get_font('Arial', 16, bold=True)
         self.edit_mode = False
         self.editing_particle = None
         
@@ -694,32 +797,45 @@ class CreationForm:
                 return None
         return None
 
+    def ui_key(self):
+        if not self.active:
+            return (False,)
+        # everything inside the form is drawn by the form, so its key covers its components
+        components = (self.btn_remember, self.btn_charge_sign, self.input_charge_mantissa,
+                      self.input_charge_exponent, self.input_mass_mantissa, self.input_mass_exponent,
+                      self.slider_restitution, self.angle_wheel, self.input_vel_mantissa,
+                      self.input_vel_exponent, self.btn_env, self.btn_static)
+        return (True, tuple(self.rect), self.edit_mode) + tuple(c.ui_key() for c in components)
+
+    def ui_bounds(self):
+        return self.rect if self.active else pygame.Rect(0, 0, 0, 0)
+
     def render(self, screen):
         if not self.active: return
         pygame.draw.rect(screen, COL_BG, self.rect)
         pygame.draw.rect(screen, COL_BORDER, self.rect, 2)
         
         title_text = "Edit Charge" if self.edit_mode else "Create Charge"
-        title = self.font.render(title_text, True, COL_TEXT)
+        title = render_text(self.font, title_text, COL_TEXT)
         screen.blit(title, (self.rect.x + 20, self.rect.y + 20))
         
         # Labels
-        l_chg = self.font.render("Charge:", True, COL_TEXT)
+        l_chg = render_text(self.font, "Charge:", COL_TEXT)
         screen.blit(l_chg, (self.rect.x + 100, self.input_charge_mantissa.rect.top - 20))
-        l_mass = self.font.render("Mass:", True, COL_TEXT)
+        l_mass = render_text(self.font, "Mass:", COL_TEXT)
         screen.blit(l_mass, (self.rect.x + 100, self.input_mass_mantissa.rect.top - 20))
-        l_cor = self.font.render("Bounce:", True, COL_TEXT)
+        l_cor = render_text(self.font, "Bounce:", COL_TEXT)
         screen.blit(l_cor, (self.rect.x + 100, self.slider_restitution.rect.top - 20))
         
-        l_vel = self.font.render("Initial Velocity:", True, COL_TEXT)
+        l_vel = render_text(self.font, "Initial Velocity:", COL_TEXT)
         screen.blit(l_vel, (self.rect.x + 140, self.input_vel_mantissa.rect.top - 20))
 
         # Exponent Labels (x 10 ^)
-        exp_c = self.font.render("x 10 ^", True, COL_TEXT)
+        exp_c = render_text(self.font, "x 10 ^", COL_TEXT)
         screen.blit(exp_c, (self.input_charge_mantissa.rect.right + 10, self.input_charge_mantissa.rect.centery - 8))
-        exp_m = self.font.render("x 10 ^", True, COL_TEXT)
+        exp_m = render_text(self.font, "x 10 ^", COL_TEXT)
         screen.blit(exp_m, (self.input_mass_mantissa.rect.right + 10, self.input_mass_mantissa.rect.centery - 8))
-        exp_v = self.font.render("x 10 ^", True, COL_TEXT)
+        exp_v = render_text(self.font, "x 10 ^", COL_TEXT)
         screen.blit(exp_v, (self.input_vel_mantissa.rect.right + 10, self.input_vel_mantissa.rect.centery - 8))
 
         # Render Components
@@ -740,20 +856,20 @@ class CreationForm:
         pygame.draw.rect(screen, (100, 200, 100), self.btn_submit)
         pygame.draw.rect(screen, (0,0,0), self.btn_submit, 1)
         submit_text = "CHANGE" if self.edit_mode else "SPAWN"
-        ts = self.font.render(submit_text, True, (0,0,0))
+        ts = render_text(self.font, submit_text, (0,0,0))
         ts_rect = ts.get_rect(center=self.btn_submit.center)
         screen.blit(ts, ts_rect)
         
         pygame.draw.rect(screen, (200, 100, 100), self.btn_cancel)
         pygame.draw.rect(screen, (0,0,0), self.btn_cancel, 1)
-        tc = self.font.render("CANCEL", True, (0,0,0))
+        tc = render_text(self.font, "CANCEL", (0,0,0))
         tc_rect = tc.get_rect(center=self.btn_cancel.center)
         screen.blit(tc, tc_rect)
 
         if self.edit_mode:
             pygame.draw.rect(screen, (50, 50, 50), self.btn_delete)
             pygame.draw.rect(screen, (0,0,0), self.btn_delete, 1)
-            td = self.font.render("DELETE", True, (255,255,255))
+            td = render_text(self.font, "DELETE", (255,255,255))
             td_rect = td.get_rect(center=self.btn_delete.center)
             screen.blit(td, td_rect)
 
@@ -773,7 +889,7 @@ class GenericSlider:
         self.label = label
         
         self.dragging = False
-        self.font = pygame.font.SysFont('Arial', 14)
+        self.font = get_font('Arial', 14)
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -802,9 +918,20 @@ class GenericSlider:
         ratio = max(0.0, min(1.0, relative_x / self.slider_rect.width))
         self.value = self.min_val + ratio * (self.max_val - self.min_val)
 
+    def ui_key(self):
+        return (tuple(self.slider_rect), self.value, self.dragging, self.label)
+
+    def ui_bounds(self):
+        # label above, track + knob, and the value text to its right
+        bounds = self.slider_rect.inflate(2 * self.knob_radius + 2, 2 * self.knob_radius + 2)
+        w, h = self.font.size(self.label)
+        bounds.union_ip(pygame.Rect(self.rect.x, self.rect.y - 20, w, h))
+        w, h = self.font.size(self.fmt.format(self.value))
+        return bounds.union(pygame.Rect(self.slider_rect.right + 10, self.slider_rect.centery - 7, w, h))
+
     def render(self, screen):
         # Label
-        label_surf = self.font.render(self.label, True, (0, 0, 0))
+        label_surf = render_text(self.font, self.label, (0, 0, 0))
         screen.blit(label_surf, (self.rect.x, self.rect.y - 20))
         
         # Track
@@ -827,5 +954,79 @@ class GenericSlider:
         
         # Value Text
         val_str = self.fmt.format(self.value)
-        value_text = self.font.render(val_str, True, (0, 0, 0))
-        screen.blit(value_text, (self.slider_rect.right + 10, self.slider_rect.centery - 7))
\ No newline at end of file
+        value_text = render_text(self.font, val_str, (0, 0, 0))
+        screen.blit(value_text, (self.slider_rect.right + 10, self.slider_rect.centery - 7))
+
+# --- RETAINED UI LAYER ---
+# Widgets are drawn once into a shared transparent overlay and only redrawn when they change:
+# every widget reports ui_key() (everything its render() depends on: value, hover, text, position ...)
+# and ui_bounds() (the screen area it draws into). Each frame the layer compares keys with the last
+# frame, clears the areas of the widgets that changed, appeared or disappeared and re-renders there
+# (clipped, every widget overlapping that area, in draw order). The overlay then goes to the screen
+# as one Surface.blits call covering just the widgets' areas.
+#
+#   ui.add(reset_btn, start_btn, ...)   # this frame's widgets, in draw order
+#   ui.render(screen)
+
+def _merge_rects(rects):
+    """Union overlapping rectangles so no pixel is cleared or blitted twice."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if not rect.width or not rect.height:
+            continue
+        i = rect.collidelist(merged)
+        while i >= 0:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+class UILayer:
+
+    def __init__(self, size=(SW, SH)):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, 0))
+        self._frame = []     # widgets added this frame
+        self._shown = {}     # widget -> (key, bounds) as currently drawn in the overlay
+        self._areas = []     # merged bounds of everything shown (what gets blitted)
+        self.redraws = 0     # areas re-rendered so far (profiling)
+
+    def add(self, *widgets):
+        self._frame.extend(widgets)
+
+    def invalidate(self):
+        """Redraw everything next frame."""
+        self._shown = {}
+        self.surface.fill((0, 0, 0, 0))
+
+    def render(self, screen):
+        widgets, self._frame = self._frame, []
+        current = {}
+        dirty = []
+        for widget in widgets:
+            key, bounds = widget.ui_key(), pygame.Rect(widget.ui_bounds())
+            current[widget] = (key, bounds)
+            old = self._shown.get(widget)
+            if old is None or old[0] != key:
+                dirty.append(bounds)
+                if old is not None:
+                    dirty.append(old[1])
+        for widget, (key, bounds) in self._shown.items():
+            if widget not in current:
+                dirty.append(bounds)  # gone this frame
+
+        if dirty:
+            surf = self.surface
+            for area in _merge_rects(dirty):
+                surf.set_clip(area)
+                surf.fill((0, 0, 0, 0))
+                for widget, (key, bounds) in current.items():
+                    if bounds.colliderect(area):
+                        widget.render(surf)
+                self.redraws += 1
+            surf.set_clip(None)
+            self._areas = _merge_rects(bounds for key, bounds in current.values())
+        self._shown = current
+
+        screen.blits([(self.surface, area.topleft, area) for area in self._areas], doreturn=False)
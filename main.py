@@ -1,5 +1,6 @@
 import pygame
 import sys
+import time
 import numpy as np
 
 # IMPORTS
@@ -8,9 +9,21 @@ from point_charges import *
 from electric_field import *
 from physics_engine import *
 from gui import *
-from phase4_visualiser import Phase4Visualiser
-phase4 = Phase4Visualiser()
-phase4.start()
+from profiler import FrameProfiler
+from telemetry import TelemetrySink
+from physics_process import PhysicsProcess
+from timestep import FixedTimestep
+from scheduler import FrameScheduler
+from trails import TrailLayer, TrailHistory
+from state_bus import StateBus
+from particle_store import SceneCache, scene_version, touch_scene
+# particle state is published once per frame to a versioned double-buffered bus; the 3D view
+# (and any other consumer) reads it zero-copy and skips work when the version hasn't moved
+state_bus = StateBus(STATE_BUS_CAPACITY, shared=PHASE4_MODE == "process")
+# 3D potential view (PHASE4_MODE): drawn into this window by a NumPy renderer, or the matplotlib
+# window in its own process / on a thread. Nothing of it (module, matplotlib, Tk, thread, child
+# process) is loaded until the first PHASE4_KEY press, see the event loop
+phase4 = None
 
 # --- 1. INITIALIZATION & SETUP ---
 pygame.init()
@@ -27,6 +40,8 @@ start_btn = StartButton()
 context_menu = ContextMenu()
 create_form = CreationForm()
 trails_toggle = TrailsToggle()
+trails = TrailLayer() if TRAIL_MODE == "layer" else TrailHistory()
+ui = UILayer()
 
 # Sliders
 wall_cor_slider = WallCORSlider(30, 20, 150, 30, initial_value=BW_coeff)
@@ -34,10 +49,41 @@ dt_slider = GenericSlider(1250, 50, 150, 30,min_val=0.00005, max_val=0.02, initi
                           label="Time Step (dt):", fmt="{:.5f}")
 fps_slider = GenericSlider(1250, 100, 150, 30, min_val=60, max_val=9000, initial_val=100, 
                            label="Max FPS:", fmt="{:.0f}")
+speed_slider = GenericSlider(1250, 150, 150, 30, min_val=0.01, max_val=2.0, initial_val=SIM_REAL_TIME_FACTOR,
+                             label="Sim Speed (x real time):", fmt="{:.2f}")
 
 # engine
 physics_engine = PhysicsEngine()
 
+# fixed-timestep scheduler: K physics steps of dt per frame from the real-time factor (F7 = turbo)
+stepper = FixedTimestep()
+
+# optional: physics in its own process, this loop only draws the latest snapshot
+physics_proc = PhysicsProcess() if PHYSICS_IN_PROCESS else None
+
+# per-phase frame timing (F3 = overlay, F5 = export CSV + Chrome trace)
+profiler = FrameProfiler()
+physics_engine.profiler = profiler
+
+# particle telemetry (TELEMETRY_* in constants_for_all_files.py)
+telemetry = TelemetrySink()
+frame_number = 0
+
+# Frame-budget scheduler: physics > particles > heatmap > trails > phase 4
+# (GUI is measured too so the optional work leaves room for it)
+scheduler = FrameScheduler()
+scheduler.add("physics", 0, essential=True)
+scheduler.add("particles", 1, essential=True)
+scheduler.add("gui", 1, essential=True)
+scheduler.add("heatmap", 2)
+scheduler.add("trails", 3)
+scheduler.add("phase4", 4)
+
+# Scene-version caches: skip per-frame work while nothing in the scene changed
+scale_cache = SceneCache()
+arrow_cache = SceneCache()
+bus_cache = SceneCache()
+
 # --- 3. STATE MANAGEMENT ---
 # 0 = SETUP (Edit Mode), 1 = RUNNING (Physics Mode)
 sim_state = 0 
@@ -54,23 +100,27 @@ last_click_pc_id = None
 # Energy tracking
 total_kinetic_energy = 0.0
 total_potential_energy = 0.0
-initial_total_energy = None  # Set when simulation starts
-energy_font = pygame.font.SysFont('Arial', 16)
+initial_total_energy = None  # Set when simulation starts (owned by physics_engine.diagnostics)
+energy_font = get_font('Arial', 16)
 
 # Pause text bouncing (DVD logo style)
 
 import math
 pause_text_pos = [SW // 2, SH // 2]
 pause_text_vel = [900 * math.cos(math.radians(40)), 900 * math.sin(math.radians(40))]  # 40 degrees
-pause_font = pygame.font.SysFont("Roboto", 74)
+pause_font = get_font("Roboto", 74)
 
 # core simulation loop
 
 running = True
 while running:
     
+    profiler.begin_frame()
+
     dt = dt_slider.value
     fps = int(fps_slider.value)
+    stepper.real_time_factor = speed_slider.value
+    scheduler.begin_frame(max(1.0 / fps, FRAME_BUDGET_MS / 1000.0))
 
     # --- A. TIME & MOUSE ---
     mouse_pos = pygame.mouse.get_pos()
@@ -80,6 +130,42 @@ while running:
         # 1. GLOBAL: Quit
         if event.type == pygame.QUIT:
             running = False
+
+        # Profiler / telemetry hotkeys (work in any state)
+        if event.type == pygame.KEYDOWN:
+            if event.key == PROFILER_OVERLAY_KEY:
+                profiler.toggle_overlay()
+            elif event.key == PROFILER_EXPORT_KEY:
+                csv_path, trace_path = profiler.export()
+                print(f"Profile written to {csv_path} and {trace_path}")
+            elif event.key == TURBO_KEY:
+                stepper.toggle_turbo()
+                print(f"Turbo {'ON' if stepper.turbo else 'OFF'}")
+            elif event.key == TELEMETRY_VERBOSITY_KEY:
+                telemetry.set_verbosity((telemetry.verbosity + 1) % 3)
+                print(f"Telemetry verbosity: {telemetry.verbosity}")
+
+            elif event.key == PHASE4_KEY:
+                if phase4 is None:
+                    # first press: import and build the 3D view
+                    if PHASE4_MODE == "embedded":
+                        from surface_view import SurfaceView
+                        phase4 = SurfaceView()
+                    elif PHASE4_MODE == "process":
+                        from phase4_visualiser import Phase4Process
+                        phase4 = Phase4Process()
+                    else:
+                        from phase4_visualiser import Phase4Visualiser
+                        phase4 = Phase4Visualiser()
+                    phase4.attach(state_bus)
+                if phase4.alive:
+                    phase4.stop()
+                else:
+                    phase4.start()
+
+        # 3D viewport: orbit / zoom with the mouse inside it (the scene underneath never sees those)
+        if PHASE4_MODE == "embedded" and phase4 is not None and phase4.handle_event(event):
+            continue
         
         # 2. GLOBAL: Reset Button (Works in ANY state to save you)
         if reset_btn.handle_event(event):
@@ -87,6 +173,11 @@ while running:
             # Reset all charges to initial positions and velocities
             for pc in all_point_charges:
                 pc.reset()
+            trails.clear()
+            physics_engine.reset_energy()
+            stepper.reset()
+            if physics_proc is not None:
+                physics_proc.pause()
             print("SIMULATION RESET")
 
         # --- C. STATE SPECIFIC EVENTS ---
@@ -126,9 +217,12 @@ while running:
                     selected_charge = None
                     context_menu.active = False
                     create_form.active = False
-                    # Capture initial energy
-                    ke_init, pe_init = physics_engine.compute_energy(all_point_charges)
-                    initial_total_energy = ke_init + pe_init
+                    # Capture initial energy (full pass once; later frames are sampled by the engine)
+                    initial_total_energy = physics_engine.begin_diagnostics(all_point_charges)
+                    stepper.reset()
+                    if physics_proc is not None:
+                        physics_proc.load(all_point_charges, dt, wall_cor, initial_total_energy)
+                        physics_proc.resume()
                     print("SIMULATION STARTED")
                     print(f"Initial Total Energy: {initial_total_energy:.2e} J")
 
@@ -136,6 +230,7 @@ while running:
             wall_cor_slider.handle_event(event)
             dt_slider.handle_event(event)
             fps_slider.handle_event(event)
+            speed_slider.handle_event(event)
 
             # 3. Context Menu Logic
             menu_action = context_menu.handle_event(event)
@@ -175,6 +270,7 @@ while running:
                         # update velocity if provided <--- FIX IS HERE
                         particle.vel_0 = form_data['velocity'] 
                         particle.vel = form_data['velocity'].copy()
+                        touch_scene()  # vel_0 (arrows) is a plain attribute
                     else:
                         # Create new particle
                         new_pc = PointCharge(
@@ -274,10 +370,13 @@ while running:
             wall_cor_slider.handle_event(event)
             dt_slider.handle_event(event)
             fps_slider.handle_event(event)
+            speed_slider.handle_event(event)
 
             if pause_btn.handle_event(event):
                 print(f"DEBUG: Pause clicked at {getattr(event, 'pos', None)}, create_form.active={create_form.active}, context_menu.active={context_menu.active}")
                 sim_state = 0.5 # Literally just pauses the sim
+                if physics_proc is not None:
+                    physics_proc.pause()
 
             elif reset_btn.handle_event(event):
                 sim_state = 0
@@ -287,17 +386,13 @@ while running:
                 all_point_charges = [pc for pc in all_point_charges if pc.environmental]
                 for pc in all_point_charges:
                     pc.reset()
+                trails.clear()
 
             # Trails toggle (only active in running state)
             if trails_toggle.handle_event(event):
                 # handle_event already toggles internal state; when turned off, clear existing trails
                 if not trails_toggle.state:
-                    for pc in all_point_charges:
-                        try:
-                            pc.history.clear()
-                            pc.frame_counter = 0
-                        except Exception:
-                            pass
+                    trails.clear()
 
         elif sim_state == 0.5:
 
@@ -305,6 +400,9 @@ while running:
             if unpause_btn.handle_event(event):
                 print(f"DEBUG: Unpause clicked at {getattr(event, 'pos', None)}, create_form.active={create_form.active}, context_menu.active={context_menu.active}")
                 sim_state = 1 # Resume Simulation
+                stepper.reset() # don't bill the paused time to the accumulator
+                if physics_proc is not None:
+                    physics_proc.resume()
 
             elif reset_btn.handle_event(event):
                 sim_state = 0
@@ -314,58 +412,65 @@ while running:
                 all_point_charges = [pc for pc in all_point_charges if pc.environmental]
                 for pc in all_point_charges:
                     pc.reset()
+                trails.clear()
+
+    profiler.lap("events")
 
     # --- D. LOGIC UPDATES (General) ---
     
     # Update wall coefficient
     wall_cor = wall_cor_slider.value 
 
-    # Update visual scales (Always needed for rendering)
-    for pc in all_point_charges:
-        pc.update_relative_scale(all_point_charges)
+    # Update visual scales (only when a charge / mass / position changed)
+    if scale_cache.needs_update(all_point_charges):
+        for pc in all_point_charges:
+            pc.update_relative_scale(all_point_charges)
+
+    profiler.lap("relative_scale")
 
     # --- E. PHYSICS UPDATES (State Dependent) ---
 
-    if sim_state == 1:
+    if sim_state != 1:
+        scheduler.idle("physics")  # setup / paused: its last cost mustn't starve heatmap & co
 
-        # Get arrays for physics engine
-        positions = np.array([p.pos for p in all_point_charges])
-        velocities = np.array([p.vel for p in all_point_charges])
-        charges = np.array([p.charge for p in all_point_charges])
-        masses = np.array([p.mass for p in all_point_charges])
-        static_status = np.array([p.static for p in all_point_charges], dtype=bool)
+    if sim_state == 1:
 
-        # 1. The Velocity-Verlet integration step (Motion with forces)
-        physics_engine.get_accelerations(positions, velocities, charges, masses, static_status)
-        physics_engine.update_positions_velocities(dt, all_point_charges)
-        
-        # 2. Handle collisions AFTER integration
-        physics_engine.handle_wall_collisions(all_point_charges, wall_cor)
-        physics_engine.handle_particle_collisions(all_point_charges)
-        
-        # 3. Energy correction (only if all collisions are perfectly elastic)
-        # Check if all particles have e=1.0 and wall_cor=1.0
-        all_elastic = all(getattr(pc, 'e', 1.0) == 1.0 for pc in all_point_charges) and wall_cor == 1.0
-        
-        if all_elastic and initial_total_energy is not None:
-            # Calculate current energy
-            current_ke, current_pe = physics_engine.compute_energy(all_point_charges)
-            current_total = current_ke + current_pe
-            
-            # Only correct if there's actually kinetic energy to scale
-            if current_ke > 1e-10 and abs(current_total - initial_total_energy) > 1e-6:
-                # Scale velocities to restore energy
-                scale_factor = np.sqrt(max(0, (initial_total_energy - current_pe) / current_ke))
-                for pc in all_point_charges:
-                    if not pc.static:
-                        pc.vel *= scale_factor
+        scheduler.begin("physics")
+        if physics_proc is not None:
+            # Physics runs in its own process: forward slider changes as commands and
+            # copy the latest consistent snapshot into the particles
+            physics_proc.set_params(dt=dt, wall_cor=wall_cor, real_time_factor=stepper.real_time_factor,
+                                    turbo=stepper.turbo)
+            physics_proc.sync(physics_engine, all_point_charges)
+        else:
+            # 1. Velocity-Verlet integration, wall + particle collisions, then the sampled
+            #    energy diagnostics (elastic correction included) — see PhysicsEngine.step
+            #    Fixed timestep: as many steps of exactly dt as the wall time owes the sim.
+            physics_engine.store.bind(all_point_charges)
+            substeps = stepper.substeps(dt)
+            if substeps < 0:
+                # turbo: step flat out until this iteration's budget is used
+                deadline = stepper.turbo_deadline()
+                while True:
+                    physics_engine.step(dt, all_point_charges, wall_cor)
+                    if time.perf_counter() >= deadline:
+                        break
+            else:
+                for i in range(substeps):
+                    if i == substeps - 1:
+                        stepper.save_previous(physics_engine.store.positions)
+                    physics_engine.step(dt, all_point_charges, wall_cor)
+        scheduler.end("physics")
+        profiler.lap("physics")
 
         # Record trails for each particle (only if toggle enabled)
-        for pc in all_point_charges:
-            pc.record_trail(trails_toggle.state)
+        if trails_toggle.state:
+            physics_engine.store.bind(all_point_charges)
+            trails.record(all_point_charges, physics_engine.store.positions)
         
-        # Calculate energies using physics engine (ensures consistency with force calculations)
-        total_kinetic_energy, total_potential_energy = physics_engine.compute_energy(all_point_charges)
+        # Latest sampled energies (PE comes from the force kernel, no extra pass)
+        total_kinetic_energy = physics_engine.diagnostics.kinetic_energy
+        total_potential_energy = physics_engine.diagnostics.potential_energy
 
     # Update pause text position (bouncing DVD logo style)
     elif sim_state == 0.5:
@@ -373,9 +478,7 @@ while running:
         pause_text_pos[1] += pause_text_vel[1] * dt*19
         
         # Bounce off walls (with margin for text width/height)
-        text_bounds = pause_font.render("PAUSED", True, (0, 0, 0)).get_rect()
-        text_width = text_bounds.width
-        text_height = text_bounds.height
+        text_width, text_height = pause_font.size("PAUSED")  # metrics only, nothing rasterised
         
         if pause_text_pos[0] - text_width//2 <= 0 or pause_text_pos[0] + text_width//2 >= SW:
             pause_text_vel[0] *= -1
@@ -385,49 +488,105 @@ while running:
             pause_text_vel[1] *= -1
             pause_text_pos[1] = max(text_height//2, min(SH - text_height//2, pause_text_pos[1]))
 
+    profiler.lap("logic")
+
+    # Particle state -> rate-limited binary telemetry (console only gets periodic summaries)
+    physics_engine.store.bind(all_point_charges)
+    telemetry.record(frame_number, physics_engine.sim_time, physics_engine.store, physics_engine.diagnostics)
+    profiler.lap("telemetry")
+
+    # Particle state -> state bus, once per frame whenever the scene changed (uninterpolated physics
+    # state; the 3D views, and any other reader, take zero-copy snapshots from it)
+    if bus_cache.needs_update(all_point_charges):
+        store = physics_engine.store
+        store.refresh()  # charges / sizes may have been edited in setup
+        state_bus.publish(len(store), positions=store.positions, velocities=store.velocities,
+                          charges=store.charges, radii=store.radii,
+                          ids=store.ids, sim_time=physics_engine.sim_time,
+                          scene_version=scene_version(), frame=frame_number)
+        if PHASE4_MODE == "process" and phase4 is not None:
+            phase4.follow_bus()  # bus grew -> new shared block for the child to attach to
+    frame_number += 1
+    profiler.lap("bus")
+
+    # Turbo: physics keeps running flat out, only every TURBO_RENDER_EVERY-th iteration is drawn
+    if sim_state == 1 and not stepper.should_render():
+        profiler.end_frame()
+        continue
+
+    # Draw positions interpolated between the last two physics states (restored after drawing)
+    if sim_state == 1:
+        stepper.begin_interpolation(physics_engine.store)
+
     # --- F. RENDERING (The Layers) ---
     
     # Layer 0: Background (E-Field)
-    ef_system.render(screen, all_point_charges)
+    if scheduler.should_run("heatmap"):
+        scheduler.begin("heatmap")
+        ef_system.render(screen, all_point_charges, busy_ms=clock.get_rawtime())  # resolution follows frame time
+        scheduler.end("heatmap")
+    else:
+        ef_system.render_cached(screen, all_point_charges)  # over budget: last frame's heatmap
+    profiler.lap("heatmap")
     
     # Layer 1: Environment (Walls)
     pygame.draw.rect(screen, WC, WALL_RECT, WBT) 
     
-    # Layer 2: Particles (render trails behind particles)
+    # Layer 2: Particles (all trails first so every trail sits behind every particle)
+
+    trail_stride = scheduler.stride("trails")  # busy frame: coarser trail LOD rather than no trails
+    scheduler.begin("trails", trail_stride)
+    trails.render(screen, trail_stride)
+    scheduler.end("trails")
+    profiler.lap("trails")
     
+    scheduler.begin("particles")
+    refresh_arrows = sim_state == 0 and arrow_cache.needs_update(all_point_charges)
     for pc in all_point_charges:
         # Only show arrows in setup mode (sim_state == 0)
         if sim_state == 0:
-            pc.update_arrow(all_point_charges)
+            if refresh_arrows:
+                pc.update_arrow(all_point_charges)
             pc.arrow_display = True
         else:
             pc.arrow_display = False
-        pc.render_trails(screen)
-        pc.render(screen)
+    # every particle from its cached sprite, one blits call over the store's positions
+    physics_engine.store.bind(all_point_charges)
+    render_particles(screen, all_point_charges, physics_engine.store.positions)
+    scheduler.end("particles")
+    profiler.lap("particles")
+
+    # Layer 2.5: 3D potential view (reads the state bus; the window / child modes poll it themselves)
+    if PHASE4_MODE == "embedded" and phase4 is not None and phase4.alive:
+        if phase4.stale and scheduler.should_run("phase4"):
+            # new bus version or camera moved: re-project + redraw (deferred while over budget)
+            scheduler.begin("phase4")
+            phase4.render(screen)
+            scheduler.end("phase4")
+        else:
+            phase4.render_cached(screen)  # one blit of the last drawn viewport
+    profiler.lap("phase4")
 
     # Layer 3: GUI (State Dependent)
 
     # Always show Reset
-    reset_btn.render(screen)
+    # (widgets go through the retained UI layer: redrawn only when their state changed, one blit)
+    scheduler.begin("gui")
+    ui.add(reset_btn)
     
     if sim_state == 0:
         # Only show Setup GUI in Setup Mode
-        start_btn.render(screen)
-        wall_cor_slider.render(screen)
-        context_menu.render(screen)
-        create_form.render(screen)
-        dt_slider.render(screen)
-        fps_slider.render(screen)
+        ui.add(start_btn, wall_cor_slider, context_menu, create_form, dt_slider, fps_slider, speed_slider)
 
     elif sim_state == 1:
-        pause_btn.render(screen)
-        trails_toggle.render(screen)
-        dt_slider.render(screen)
-        fps_slider.render(screen)
+        ui.add(pause_btn, trails_toggle, dt_slider, fps_slider, speed_slider)
 
     elif sim_state == 0.5:
-        unpause_btn.render(screen)
-        
+        ui.add(unpause_btn)
+
+    ui.render(screen)
+
+    if sim_state == 0.5:
         # Render PAUSED text with bouncing and letter borders
         pause_text = "PAUSED"
         letter_color = (250, 190, 200)  # Pink
@@ -436,30 +595,42 @@ while running:
         
         # Render each letter individually with border
         letter_spacing = 10
-        total_width = sum(pause_font.render(char, True, letter_color).get_width() for char in pause_text) + (len(pause_text) - 1) * letter_spacing
+        # (glyphs come from the shared text cache: rasterised once, not 5 times per letter per frame)
+        total_width = sum(render_text(pause_font, char, letter_color).get_width() for char in pause_text) + (len(pause_text) - 1) * letter_spacing
         start_x = pause_text_pos[0] - total_width // 2
         
         for i, char in enumerate(pause_text):
-            char_surf = pause_font.render(char, True, letter_color)
+            char_surf = render_text(pause_font, char, letter_color)
             char_width = char_surf.get_width()
             
-            # Draw border around letter (by rendering text 4 times around it)
+            # Draw border around letter (by blitting it 4 times around it)
+            border_surf = render_text(pause_font, char, border_color)
             for dx, dy in [(-border_width, 0), (border_width, 0), (0, -border_width), (0, border_width)]:
-                border_surf = pause_font.render(char, True, border_color)
                 screen.blit(border_surf, (start_x + dx, pause_text_pos[1] - char_surf.get_height()//2 + dy))
             
             # Draw actual letter on top
             screen.blit(char_surf, (start_x, pause_text_pos[1] - char_surf.get_height()//2))
             start_x += char_width + letter_spacing
 
-    phase4.update(all_point_charges)
+    scheduler.end("gui")
+    profiler.lap("gui")
 
+    stepper.end_interpolation(physics_engine.store)
+
+    profiler.render_overlay(screen)
     pygame.display.flip()
-    clock.tick(fps)
+    profiler.lap("flip")
+    clock.tick(0 if stepper.turbo else fps)  # turbo: no FPS cap
+    profiler.lap("tick_wait")
 
-    for pc in all_point_charges:
-        print(f"ID {getattr(pc, 'pc_id', 'N/A')}: Pos {pc.pos}, Vel {pc.vel}, Pos_0 {pc.pos_0}, Vel_0 {pc.vel_0}")
+    profiler.end_frame()
 
 pygame.quit()
-phase4.stop()
+ef_system.close()
+telemetry.close()
+if physics_proc is not None:
+    physics_proc.stop()
+if phase4 is not None:
+    phase4.stop()
+state_bus.close()
 sys.exit()
\ No newline at end of file
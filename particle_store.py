@@ -0,0 +1,185 @@
+# below is particle_store.py
+
+# necessary imports
+
+import numpy as np
+
+# Structure-of-arrays mirror of the live particle list.
+# PointCharge objects keep working exactly as before (pc.position, pc.vel ...) but once bound
+# their position / velocity ARE rows of the store arrays, so whole-system maths can be done
+# with single numpy operations and per-object code sees the result immediately.
+
+
+# ── scene version ─────────────────────────────────────────────────────────────
+# One global counter, bumped by every mutation that changes what the scene looks like
+# (position / velocity / charge / mass / static writes, physics steps). Consumers that only
+# depend on that state (heatmap, relative scales, arrows, Phase 4) remember which version and
+# particle list they last worked from and skip the work while neither has changed.
+
+_scene_version = 0
+
+
+def scene_version():
+    return _scene_version
+
+
+def touch_scene():
+    global _scene_version
+    _scene_version += 1
+
+
+class SceneCache:
+    """Per-consumer record of the scene version / particle list last worked from."""
+
+    def __init__(self):
+        self.version = -1
+        self.members = []
+
+    def needs_update(self, items):
+        """
+        True if the scene or the membership of `items` changed since the last call that
+        returned True. Records the version at the time of the check, so mutations made while
+        doing the work (e.g. a dragged particle) trigger another update next time.
+        """
+        if self.version == _scene_version and items == self.members:
+            return False
+        self.version = _scene_version
+        self.members = list(items)
+        return True
+
+    def invalidate(self):
+        self.version = -1
+
+
+def scene_property(name):
+    """Plain attribute that bumps the scene version when its value changes."""
+    attr = '_' + name
+
+    def getter(self):
+        return getattr(self, attr)
+
+    def setter(self, value):
+        if getattr(self, attr, None) != value:
+            setattr(self, attr, value)
+            touch_scene()
+
+    return property(getter, setter)
+
+
+class StoreBacked:
+    """
+    Mixin for particle objects whose position/velocity can live inside a ParticleStore.
+    Until bound, the object owns its own (2,) arrays. Assigning `obj.position = ...` or
+    `obj.vel = ...` always writes IN PLACE so a bound row view is never replaced, and bumps
+    the scene version if the value changed (`obj.position += d` hands the setter the already
+    modified array itself, which always counts as a change).
+    """
+
+    def _init_state(self, position, vel):
+        self._position = np.array(position, dtype=float)
+        self._vel = np.array(vel, dtype=float)
+        self._store = None
+        self._store_index = -1
+        touch_scene()
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        if value is self._position or not np.array_equal(self._position, value):
+            self._position[:] = value
+            touch_scene()
+
+    @property
+    def vel(self):
+        return self._vel
+
+    @vel.setter
+    def vel(self, value):
+        if value is self._vel or not np.array_equal(self._vel, value):
+            self._vel[:] = value
+            touch_scene()
+
+    def _attach(self, store, index, position_row, vel_row):
+        # rows already hold the current values (copied by the store)
+        self._position = position_row
+        self._vel = vel_row
+        self._store = store
+        self._store_index = index
+
+    def _detach(self):
+        # take a private copy so the object no longer aliases store memory
+        self._position = self._position.copy()
+        self._vel = self._vel.copy()
+        self._store = None
+        self._store_index = -1
+
+
+class ParticleStore:
+    """
+    Arrays for N particles, in the same order as the particle list they were bound from:
+        positions (N,2), velocities (N,2)   -> shared with the objects (views)
+        charges, masses, e, radii (N,), static (N,) bool, dynamic = ~static   -> gathered copies
+        ids (N,)   -> pc_id of each particle (-1 if it has none)
+    """
+
+    def __init__(self):
+        self.particles = []
+        self.positions = np.zeros((0, 2), dtype=float)
+        self.velocities = np.zeros((0, 2), dtype=float)
+        self.charges = np.zeros(0, dtype=float)
+        self.masses = np.zeros(0, dtype=float)
+        self.e = np.zeros(0, dtype=float)
+        self.radii = np.zeros(0, dtype=float)
+        self.static = np.zeros(0, dtype=bool)
+        self.dynamic = np.zeros(0, dtype=bool)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.membership_version = 0  # bumped whenever the bound particle list changes
+
+    def __len__(self):
+        return len(self.particles)
+
+    def bind(self, all_charges):
+        """
+        Mirror `all_charges` (same order). A cheap no-op when the membership hasn't changed
+        (list == compares identities since particles don't define __eq__).
+        Returns True if the arrays were rebuilt.
+        """
+        if all_charges == self.particles:
+            return False
+
+        n = len(all_charges)
+        positions = np.zeros((n, 2), dtype=float)
+        velocities = np.zeros((n, 2), dtype=float)
+        for i, p in enumerate(all_charges):
+            positions[i] = p.position
+            velocities[i] = p.vel
+
+        # anything that left the list gets its own memory back
+        kept = set(map(id, all_charges))
+        for p in self.particles:
+            if id(p) not in kept and p._store is self:
+                p._detach()
+
+        for i, p in enumerate(all_charges):
+            p._attach(self, i, positions[i], velocities[i])
+
+        self.particles = list(all_charges)
+        self.ids = np.array([getattr(p, 'pc_id', -1) for p in all_charges], dtype=np.int64)
+        self.positions = positions
+        self.velocities = velocities
+        self.membership_version += 1
+        self.refresh()
+        return True
+
+    def refresh(self):
+        """Re-gather the per-particle parameters (charge, mass, e, radius, static) from the objects."""
+        ps = self.particles
+        self.charges = np.array([p.charge for p in ps], dtype=float)
+        self.masses = np.array([p.mass for p in ps], dtype=float)
+        self.e = np.array([getattr(p, 'e', 1.0) for p in ps], dtype=float)
+        self.radii = np.array([getattr(p, 'total_radius', 0.0) for p in ps], dtype=float)
+        self.static = np.array([p.static for p in ps], dtype=bool)
+        self.dynamic = ~self.static
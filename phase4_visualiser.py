@@ -7,14 +7,22 @@ in a separate matplotlib window.
 - Positive potential regions: warped UPWARD, coloured towards white (matching existing field)
 - Negative potential regions: warped DOWNWARD, coloured towards dark/black
 - Blue wireframe overlaid on coloured surface
-- Updates 5 times per second via a background thread
+- Updates 5 times per second via a background thread (persistent artists: each update only
+  replaces vertex / colour data, so GRID_RES and the update rate can go up)
 
 USAGE:
     Import and instantiate Phase4Visualiser, then call:
         vis.update(all_point_charges)   <- call this every frame from your main loop
-        vis.start()                     <- call once after pygame init
+        vis.start()                     <- opens the window (matplotlib is only imported then)
         vis.stop()                      <- call on exit
 
+    or, instead of update(), read straight from a StateBus (state_bus.py) the main loop publishes to:
+        vis.attach(bus)                 <- zero-copy reads, redraws only when bus.version moved
+
+    or run the window in its own process (own GIL, Tk on that process's main thread):
+        vis = Phase4Process()           <- same attach / start / stop; needs a shared StateBus
+        vis.follow_bus()                <- after publishing, in case the bus was reallocated
+
 INTEGRATION (drop into your main.py):
     from phase4_visualiser import Phase4Visualiser
     phase4 = Phase4Visualiser()
@@ -27,14 +35,14 @@ INTEGRATION (drop into your main.py):
     phase4.stop()
 """
 
+import os
+import sys
+import pickle
+import subprocess
 import threading
 import time
 import numpy as np
-import matplotlib
-matplotlib.use('TkAgg')  # Must be set before importing pyplot
-import matplotlib.pyplot as plt
-from matplotlib import cm
-from matplotlib.colors import Normalize
+# matplotlib (and with it Tk) is imported by the render loop, i.e. only once the window is opened
 
 # ── constants (mirrored from constants_for_all_files.py) ──────────────────────
 K_COULOMB = 8.99e9
@@ -46,22 +54,20 @@ GRID_RES = 60          # NxN grid points
 UPDATE_INTERVAL = 0.2  # seconds between redraws (= 5 Hz)
 
 
-def _compute_potential(charges, grid_x, grid_y):
+def potential_grid(grid_x, grid_y, px, py, q, radius, chunk=256):
     """
-    Vectorised V(x,y) = sum_i  k * q_i / r_i
-    Returns a (GRID_RES, GRID_RES) float array.
+    Vectorised V(x,y) = sum_i  k * q_i / max(r_i, radius_i) on the grid
+    (charges in chunks so large N doesn't build a huge temporary).
+    Shared by the matplotlib window and the in-window view (surface_view.py).
     """
-    V = np.zeros_like(grid_x, dtype=float)
-    for pc in charges:
-        px, py = pc.position[0], pc.position[1]
-        dx = grid_x - px
-        dy = grid_y - py
-        r = np.sqrt(dx**2 + dy**2)
-        # soften to avoid singularity (use particle radius as floor)
-        r_min = getattr(pc, 'total_radius', 20.0)
-        r = np.maximum(r, r_min)
-        V += K_COULOMB * pc.charge / r
-    return V
+    gx = grid_x.ravel()[None, :]
+    gy = grid_y.ravel()[None, :]
+    V = np.zeros(gx.shape[1])
+    for s in range(0, len(q), chunk):
+        r = np.hypot(gx - px[s:s + chunk, None], gy - py[s:s + chunk, None])
+        np.maximum(r, radius[s:s + chunk, None], out=r)
+        V += (K_COULOMB * q[s:s + chunk]) @ (1.0 / r)
+    return V.reshape(grid_x.shape)
 
 
 def _make_surface_colors(V_norm):
@@ -101,6 +107,10 @@ class Phase4Visualiser:
         # Shared state between main thread (writes charges) and bg thread (reads)
         self._lock = threading.Lock()
         self._charges_snapshot = []   # list of (px, py, charge, radius) tuples
+        self._snapshot_serial = 0     # bumped on every new snapshot; the plot redraws only when it changes
+        self._snapshot_version = None # scene version the snapshot was taken at (see update)
+        self._snapshot_members = []
+        self._bus = None              # StateBus to read from instead of update() snapshots
         self._running = False
         self._thread = None
 
@@ -115,10 +125,16 @@ class Phase4Visualiser:
 
     # ── Public API ────────────────────────────────────────────────────────────
 
+    @property
+    def alive(self):
+        return self._running
+
     def start(self):
         """Spawn the background rendering thread and open the matplotlib window."""
         if self._running:
             return
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)  # previous window still closing
         self._running = True
         self._thread = threading.Thread(target=self._render_loop, daemon=True)
         self._thread.start()
@@ -127,11 +143,23 @@ class Phase4Visualiser:
         """Signal the background thread to stop."""
         self._running = False
 
-    def update(self, all_point_charges):
+    def attach(self, bus):
+        """Read charges from `bus` (a StateBus with positions / charges / radii) from now on."""
+        self._bus = bus
+
+    def update(self, all_point_charges, version=None):
         """
         Call this every frame from your main loop.
         Stores a lightweight snapshot of charge data (thread-safe).
+        If `version` (a scene version counter) is given and neither it nor the list of
+        charges changed since the last call, nothing is done.
         """
+        if (version is not None and version == self._snapshot_version
+                and all_point_charges == self._snapshot_members):
+            return
+        self._snapshot_version = version
+        self._snapshot_members = list(all_point_charges)
+
         snapshot = []
         for pc in all_point_charges:
             snapshot.append({
@@ -142,18 +170,25 @@ class Phase4Visualiser:
             })
         with self._lock:
             self._charges_snapshot = snapshot
+            self._snapshot_serial += 1
 
     # ── Background render loop ────────────────────────────────────────────────
 
     def _render_loop(self):
         """Runs in background thread. Creates and continuously updates the 3D plot."""
+        import matplotlib
+        matplotlib.use('TkAgg')  # Must be set before importing pyplot
+        import matplotlib.pyplot as plt
         plt.ion()
         fig = plt.figure(figsize=(8, 6), facecolor='#1a1a2e')
         fig.canvas.manager.set_window_title("FREE1105 — Phase 4: Potential Surface")
         ax = fig.add_subplot(111, projection='3d')
         self._style_axes(ax)
+        self._build_artists(ax)
 
         last_update = 0.0
+        drawn_serial = -1
+        drawn_version = 0
 
         while self._running:
             now = time.time()
@@ -161,91 +196,128 @@ class Phase4Visualiser:
                 plt.pause(0.02)
                 continue
 
-            last_update = now
-
-            # Grab snapshot
-            with self._lock:
-                charges = list(self._charges_snapshot)
+            # ── Grab snapshot (skip everything if nothing new was published) ──
+            if self._bus is not None:
+                snap = self._bus.latest(min_version=drawn_version)
+                if snap is None:
+                    plt.pause(0.02)
+                    continue
+                # work straight on the bus's buffer, then check it wasn't rewritten meanwhile
+                pos = snap['positions']
+                V = self._potential(pos[:, 0], pos[:, 1], snap['charges'], snap['radii'])
+                # the markers are drawn after the check, so keep the (N,) values they need
+                px, py, q = pos[:, 0].copy(), pos[:, 1].copy(), snap['charges'].copy()
+                if not self._bus.valid(snap):
+                    continue  # torn by two publishes in a row: try the newer one
+                drawn_version = snap.version
+            else:
+                if drawn_serial == self._snapshot_serial:
+                    plt.pause(0.02)
+                    continue
+                with self._lock:
+                    charges = list(self._charges_snapshot)
+                    drawn_serial = self._snapshot_serial
+                px = np.array([c['px'] for c in charges], dtype=float)
+                py = np.array([c['py'] for c in charges], dtype=float)
+                q = np.array([c['charge'] for c in charges], dtype=float)
+                radius = np.array([c['radius'] for c in charges], dtype=float)
+                V = self._potential(px, py, q, radius)
 
-            ax.cla()
-            self._style_axes(ax)
-
-            if not charges:
-                ax.set_title("No charges present", color='white', fontsize=12, pad=15)
-                plt.draw()
-                plt.pause(0.02)
-                continue
+            last_update = now
+            self._update_artists(ax, V, px, py, q)
 
-            # ── Compute potential ─────────────────────────────────────────
-            V = np.zeros_like(self._grid_x, dtype=float)
-            for c in charges:
-                dx = self._grid_x - c['px']
-                dy = self._grid_y - c['py']
-                r = np.sqrt(dx**2 + dy**2)
-                r = np.maximum(r, c['radius'])
-                V += K_COULOMB * c['charge'] / r
-
-            # ── Normalise for colour and z-height ─────────────────────────
-            v_abs_max = np.max(np.abs(V))
-            if v_abs_max == 0:
-                v_abs_max = 1.0
-            V_norm = np.clip(V / v_abs_max, -1.0, 1.0)   # [-1, 1]
-
-            # Z: positive up, negative down — scale to visual range
-            Z = V_norm * 0.4   # [-0.4, 0.4] in normalised coords
-
-            # ── Face colours (grey scale matching 2D heatmap) ─────────────
-            face_colors = _make_surface_colors(V_norm)
-
-            # ── Draw solid surface ────────────────────────────────────────
-            ax.plot_surface(
-                self._gx_norm, self._gy_norm, Z,
-                facecolors=face_colors,
-                shade=False,
-                antialiased=False,
-                zorder=1,
-            )
-
-            # ── Draw wireframe on top ─────────────────────────────────────
-            ax.plot_wireframe(
-                self._gx_norm, self._gy_norm, Z,
-                color='#00aaff',      # electric blue, matches your aesthetic
-                linewidth=0.5,
-                alpha=0.55,
-                zorder=2,
-            )
-
-            # ── Mark charge positions ──────────────────────────────────────
-            for c in charges:
-                cx_n = c['px'] / SW
-                cy_n = c['py'] / SH
-                # Interpolate z at charge position (nearest grid point)
-                ix = int(np.clip(cx_n * (self.grid_res - 1), 0, self.grid_res - 1))
-                iy = int(np.clip(cy_n * (self.grid_res - 1), 0, self.grid_res - 1))
-                cz = Z[iy, ix]
-
-                colour = '#ff3333' if c['charge'] > 0 else '#3333ff' if c['charge'] < 0 else '#888888'
-                ax.scatter(
-                    [cx_n], [cy_n], [cz + 0.03],
-                    color=colour,
-                    s=80,
-                    zorder=5,
-                    depthshade=False,
-                )
-
-            # ── Title with charge count ───────────────────────────────────
-            n_pos = sum(1 for c in charges if c['charge'] > 0)
-            n_neg = sum(1 for c in charges if c['charge'] < 0)
-            ax.set_title(
-                f"Electric Potential  |  +{n_pos} positive   −{n_neg} negative",
-                color='white', fontsize=11, pad=12
-            )
-
-            plt.draw()
+            # every artist lives in the 3D scene, whose projection and depth order are recomputed
+            # on each draw, so there is no static background to blit against: one coalesced redraw
+            fig.canvas.draw_idle()
             plt.pause(0.02)
 
         plt.close('all')
 
+    # ── Persistent artists ────────────────────────────────────────────────────
+
+    def _build_artists(self, ax):
+        """
+        Create the surface, wireframe, charge markers and title once; later ticks only
+        replace their vertex / colour data (no cla(), no re-plotting, no per-charge artists).
+        """
+        from mpl_toolkits.mplot3d.art3d import Poly3DCollection, Line3DCollection
+        R, C = self._gx_norm.shape
+
+        # surface: one quad per grid cell, corners (i,j) (i,j+1) (i+1,j+1) (i+1,j); x / y never change
+        self._quad_i = np.array([0, 0, 1, 1])[None, None, :] + np.arange(R - 1)[:, None, None]
+        self._quad_j = np.array([0, 1, 1, 0])[None, None, :] + np.arange(C - 1)[None, :, None]
+        self._quad_verts = np.empty((R - 1, C - 1, 4, 3))
+        self._quad_verts[..., 0] = self._gx_norm[self._quad_i, self._quad_j]
+        self._quad_verts[..., 1] = self._gy_norm[self._quad_i, self._quad_j]
+        self._quad_verts[..., 2] = 0.0
+        self._surface = Poly3DCollection(self._quad_verts.reshape(-1, 4, 3), linewidths=0,
+                                         antialiased=False, zorder=1)
+        ax.add_collection3d(self._surface)
+
+        # wireframe: every grid row and column as one polyline
+        self._wire_points = np.stack([self._gx_norm, self._gy_norm, np.zeros_like(self._gx_norm)], axis=-1)
+        self._wireframe = Line3DCollection(self._wire_segments(), colors='#00aaff',   # electric blue, matches your aesthetic
+                                           linewidths=0.5, alpha=0.55, zorder=2)
+        ax.add_collection3d(self._wireframe)
+
+        # charge markers: one line artist per sign instead of one scatter per charge
+        self._markers = {}
+        for sign, colour in ((1, '#ff3333'), (-1, '#3333ff'), (0, '#888888')):
+            self._markers[sign], = ax.plot([], [], [], linestyle='', marker='o', markersize=9,
+                                           color=colour, zorder=5)
+
+        self._title = ax.set_title("No charges present", color='white', fontsize=12, pad=15)
+
+    def _wire_segments(self):
+        # grid rows then grid columns, each an (n, 3) view of the wireframe points
+        return list(self._wire_points) + list(self._wire_points.transpose(1, 0, 2))
+
+    def _update_artists(self, ax, V, px, py, q):
+        if not len(q):
+            for artist in (self._surface, self._wireframe, *self._markers.values()):
+                artist.set_visible(False)
+            self._title.set_text("No charges present")
+            return
+        for artist in (self._surface, self._wireframe, *self._markers.values()):
+            artist.set_visible(True)
+
+        # ── Normalise for colour and z-height ─────────────────────────
+        v_abs_max = np.max(np.abs(V))
+        if v_abs_max == 0:
+            v_abs_max = 1.0
+        V_norm = np.clip(V / v_abs_max, -1.0, 1.0)   # [-1, 1]
+
+        # Z: positive up, negative down — scale to visual range
+        Z = V_norm * 0.4   # [-0.4, 0.4] in normalised coords
+
+        # ── Surface: new heights + face colours (grey scale matching 2D heatmap) ──
+        self._quad_verts[..., 2] = Z[self._quad_i, self._quad_j]
+        self._surface.set_verts(self._quad_verts.reshape(-1, 4, 3))
+        self._surface.set_facecolor(_make_surface_colors(V_norm[:-1, :-1]).reshape(-1, 4))
+
+        # ── Wireframe on top ──────────────────────────────────────────
+        self._wire_points[..., 2] = Z
+        self._wireframe.set_segments(self._wire_segments())
+
+        # ── Mark charge positions (z of the nearest grid point) ───────
+        cx_n = px / SW
+        cy_n = py / SH
+        ix = np.clip((cx_n * (self.grid_res - 1)).astype(int), 0, self.grid_res - 1)
+        iy = np.clip((cy_n * (self.grid_res - 1)).astype(int), 0, self.grid_res - 1)
+        cz = Z[iy, ix] + 0.03
+        for sign, marker in self._markers.items():
+            mask = np.sign(q) == sign
+            marker.set_data_3d(cx_n[mask], cy_n[mask], cz[mask])
+
+        # ── Title with charge count ───────────────────────────────────
+        n_pos = int(np.count_nonzero(q > 0))
+        n_neg = int(np.count_nonzero(q < 0))
+        self._title.set_text(f"Electric Potential  |  +{n_pos} positive   −{n_neg} negative")
+        self._title.set_fontsize(11)
+
+    def _potential(self, px, py, q, radius):
+        return potential_grid(self._grid_x, self._grid_y, px, py, q, radius)
+
     # ── Axis styling helper ───────────────────────────────────────────────────
 
     @staticmethod
@@ -262,4 +334,96 @@ class Phase4Visualiser:
         ax.set_ylabel("Y", color='#aaaacc', fontsize=8, labelpad=4)
         ax.set_zlabel("V (norm)", color='#aaaacc', fontsize=8, labelpad=4)
         ax.set_zlim(-0.5, 0.5)
-        ax.grid(False)
\ No newline at end of file
+        ax.grid(False)
+
+
+# ── Separate-process mode ────────────────────────────────────────────────────
+#
+# Same reasoning as physics_process.py: a plain subprocess reading pickled commands from stdin
+# (main.py runs its loop at import time, so a spawn-started multiprocessing child would re-import
+# it). The child attaches to the shared StateBus by name and runs the render loop on its own main
+# thread. Commands: ('attach', bus name, capacity) after the bus was reallocated, ('quit',).
+
+class Phase4Process:
+    """Parent-side handle: Phase4Visualiser in a child process, fed by a shared-memory StateBus."""
+
+    def __init__(self, grid_res=GRID_RES, update_interval=UPDATE_INTERVAL):
+        self.grid_res = grid_res
+        self.update_interval = update_interval
+        self.bus = None
+        self.proc = None
+        self._generation = None
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def attach(self, bus):
+        if not bus.shared:
+            raise ValueError("Phase4Process needs a shared StateBus (StateBus(..., shared=True))")
+        self.bus = bus
+
+    def start(self):
+        if self.alive:
+            return
+        script = os.path.abspath(__file__)
+        self.proc = subprocess.Popen(
+            [sys.executable, script, self.bus.name, str(self.bus.capacity),
+             str(self.grid_res), str(self.update_interval)],
+            stdin=subprocess.PIPE, cwd=os.path.dirname(script))
+        self._generation = self.bus.generation
+
+    def follow_bus(self):
+        """Tell the child about a reallocated bus (new shared block name)."""
+        if self.bus.generation != self._generation and self.alive:
+            self._generation = self.bus.generation
+            self._send(('attach', self.bus.name, self.bus.capacity))
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            self._send(('quit',))
+            self.proc.stdin.close()
+            self.proc.wait(timeout=2.0)
+        except Exception:
+            self.proc.kill()
+        self.proc = None
+
+    def _send(self, command):
+        try:
+            pickle.dump(command, self.proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass  # window already closed
+
+
+def _read_commands(stream, vis, buses):
+    # Blocking pickle reads on a helper thread; EOF (parent gone) also stops the window
+    from state_bus import StateBus
+    try:
+        while True:
+            command = pickle.load(stream)
+            if command[0] == 'quit':
+                break
+            if command[0] == 'attach':
+                # the old block stays mapped: the render loop may still hold views into it
+                buses.append(StateBus(command[2], name=command[1]))
+                vis.attach(buses[-1])
+    except (EOFError, OSError, pickle.UnpicklingError):
+        pass
+    vis.stop()
+
+
+def _child_main(bus_name, capacity, grid_res, update_interval):
+    from state_bus import StateBus
+    buses = [StateBus(capacity, name=bus_name)]
+    vis = Phase4Visualiser(grid_res=grid_res, update_interval=update_interval)
+    vis.attach(buses[0])
+    vis._running = True
+    threading.Thread(target=_read_commands, args=(sys.stdin.buffer, vis, buses), daemon=True).start()
+    vis._render_loop()  # Tk on this process's main thread
+
+
+if __name__ == "__main__":
+    _child_main(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]))
@@ -1,8 +1,14 @@
 # physics_engine.py
+import contextlib
 import numpy as np
 
 # Keep your existing constants import in your file
 from constants_for_all_files import *  # K_COULOMB, WALL_INNER_RECT, etc.
+from particle_store import ParticleStore, touch_scene
+from diagnostics import EnergyDiagnostics
+
+_NO_PHASE = contextlib.nullcontext()
+
 
 class PhysicsEngine:
     """
@@ -24,24 +30,55 @@ class PhysicsEngine:
         self.min_r2 = float(min_r2)
         self.debug = debug
 
+        # PE produced as a by-product of the last integration step (see get_accelerations), at the
+        # post-integration positions; read it through settled_potential_energy(). Sampled KE / PE
+        # live in self.diagnostics.
+        self.last_potential_energy = None
+        # True once wall clamps / collision corrections moved particles after that force pass
+        self._pe_stale = False
+
+        # Array mirror of the particle list the engine integrates (bound lazily on each call)
+        self.store = ParticleStore()
+        # Energy sampling / elastic correction / long-run history
+        self.diagnostics = EnergyDiagnostics()
+
+        # Simulated time / steps since the last reset_energy() (START or RESET)
+        self.sim_time = 0.0
+        self.step_count = 0
+
+        # Optional FrameProfiler (profiler.py); step() times its sub-phases when set
+        self.profiler = None
+
+    def _phase(self, name):
+        return self.profiler.phase(name) if self.profiler is not None else _NO_PHASE
+
     # ----- Force / Acceleration -----
-    def get_accelerations(self, positions, velocities, charges, masses, static_status):
+    def get_accelerations(self, positions, velocities, charges, masses, static_status, return_energy=False):
         """
         positions: (N,2) array
         velocities: (N,2) array (not used directly for Coulomb force, but kept for API)
         charges: (N,) array
         masses: (N,) array
         static_status: (N,) boolean array, True if static (immovable)
+        return_energy: if True, the softened Coulomb potential energy is accumulated
+            inside the same pairwise pass and the kinetic energy of `velocities` is added,
+            so diagnostics don't need a second O(N^2) loop
         returns: accelerations array shape (N,2)
+                 or (accelerations, kinetic_energy, potential_energy) if return_energy
         """
         n = len(positions)
         accelerations = np.zeros((n, 2), dtype=float)
+        potential_energy = 0.0
         if n < 2:
+            if return_energy:
+                return accelerations, self.kinetic_energy(velocities, masses), potential_energy
             return accelerations
 
         # Pairwise O(N^2) Coulomb. Use softening by adding eps^2 to r^2.
         for i in range(n):
-            if static_status[i]:
+            i_static = static_status[i]
+            # static particles feel no force, but their pairs still carry potential energy
+            if i_static and not return_energy:
                 continue
             net_force = np.zeros(2, dtype=float)
             pos_i = positions[i]
@@ -50,6 +87,9 @@ class PhysicsEngine:
             for j in range(n):
                 if i == j:
                     continue
+                # for a static i only the energy of pairs j > i is still needed
+                if i_static and j < i:
+                    continue
 
                 pos_j = positions[j]
                 qj = charges[j]
@@ -64,6 +104,13 @@ class PhysicsEngine:
                 r2_soft = r2 + self.softening_eps2
                 r = np.sqrt(r2_soft)
 
+                # Pair energy U_ij = k qi qj / r_soft, counted once per pair (j > i)
+                if return_energy and j > i:
+                    potential_energy += K_COULOMB * qi * qj / r
+
+                if i_static:
+                    continue
+
                 # Coulomb force magnitude: k * qi * qj / r^2_soft
                 # direction: diff / r
                 if r > 0:
@@ -73,10 +120,21 @@ class PhysicsEngine:
                     net_force += force
                 # else r extremely small, skip (shouldn't happen due to softening)
 
-            accelerations[i] = net_force / masses[i]
+            if not i_static:
+                accelerations[i] = net_force / masses[i]
 
+        if return_energy:
+            return accelerations, self.kinetic_energy(velocities, masses), potential_energy
         return accelerations
 
+    @staticmethod
+    def kinetic_energy(velocities, masses):
+        """KE = sum 1/2 m v^2 over (N,2) velocities and (N,) masses. O(N), vectorised."""
+        if len(velocities) == 0:
+            return 0.0
+        velocities = np.asarray(velocities, dtype=float)
+        return float(0.5 * np.sum(np.asarray(masses, dtype=float) * np.einsum('ij,ij->i', velocities, velocities)))
+
     # ----- Symplectic Integrator: Velocity-Verlet -----
     def update_positions_velocities(self, dt, all_charges):
         """
@@ -91,11 +149,15 @@ class PhysicsEngine:
         if n == 0:
             return
 
-        positions = np.array([p.position for p in all_charges])
-        velocities = np.array([p.vel for p in all_charges])
-        charges = np.array([p.charge for p in all_charges])
-        masses = np.array([p.mass for p in all_charges])
-        static_status = np.array([p.static for p in all_charges], dtype=bool)
+        # positions / velocities are the store arrays themselves (shared with the objects)
+        store = self.store
+        store.bind(all_charges)
+        store.refresh()
+        positions = store.positions
+        velocities = store.velocities
+        charges = store.charges
+        masses = store.masses
+        static_status = store.static
 
         # 1. initial accelerations a(t)
         a_t = self.get_accelerations(positions, velocities, charges, masses, static_status)
@@ -104,22 +166,24 @@ class PhysicsEngine:
         positions_new = positions + velocities * dt + 0.5 * a_t * (dt * dt)
 
         # Optional: keep static particles exactly fixed
-        for i, s in enumerate(static_status):
-            if s:
-                positions_new[i] = positions[i]
+        positions_new[static_status] = positions[static_status]
 
         # 3. compute accelerations at new positions a(t+dt)
-        # Note: velocities passed here are still v(t) — that's fine for force calc
-        a_tdt = self.get_accelerations(positions_new, velocities, charges, masses, static_status)
+        # Note: velocities passed here are still v(t) — that's fine for force calc.
+        # The potential energy at the new positions falls out of the same pass for free.
+        a_tdt, _, pe_tdt = self.get_accelerations(positions_new, velocities, charges, masses, static_status,
+                                                  return_energy=True)
 
         # 4. update velocities
         velocities_new = velocities + 0.5 * (a_t + a_tdt) * dt
 
-        # 5. write back into objects (skip static)
-        for i in range(n):
-            if not static_status[i]:
-                all_charges[i].position = positions_new[i]
-                all_charges[i].vel = velocities_new[i]
+        # 5. write back in place (skip static) — the particle objects see this immediately
+        dynamic = store.dynamic
+        positions[dynamic] = positions_new[dynamic]
+        velocities[dynamic] = velocities_new[dynamic]
+
+        self.last_potential_energy = pe_tdt
+        self._pe_stale = False
 
     # ----- Pairwise particle collision resolution (internal) -----
     def _resolve_pair_collision(self, p1, p2):
@@ -188,7 +252,8 @@ class PhysicsEngine:
         # -------- positional correction AFTER (with reduced correction to minimize energy injection) --------
         # Use only 80% correction to avoid overshooting and energy gain
         correction_factor = 0.8
-        
+        self._pe_stale = True  # the force pass's PE no longer matches these positions
+
         if not p1.static and not p2.static:
             p1.position += n * (overlap * correction_factor * (inv_m1 / inv_mass_sum))
             p2.position -= n * (overlap * correction_factor * (inv_m2 / inv_mass_sum))
@@ -224,18 +289,22 @@ class PhysicsEngine:
             if pc.position[0] < left_bound:
                 pc.position[0] = left_bound
                 pc.vel[0] *= -wall_cor
+                self._pe_stale = True
             elif pc.position[0] > right_bound:
                 pc.position[0] = right_bound
                 pc.vel[0] *= -wall_cor
+                self._pe_stale = True
 
             top_bound = WALL_INNER_RECT.top + pc.total_radius
             bottom_bound = WALL_INNER_RECT.bottom - pc.total_radius
             if pc.position[1] < top_bound:
                 pc.position[1] = top_bound
                 pc.vel[1] *= -wall_cor
+                self._pe_stale = True
             elif pc.position[1] > bottom_bound:
                 pc.position[1] = bottom_bound
                 pc.vel[1] *= -wall_cor
+                self._pe_stale = True
 
     # ----- Energy diagnostics -----
     def compute_energy(self, all_charges):
@@ -243,59 +312,101 @@ class PhysicsEngine:
         Returns (kinetic_energy, potential_energy) as floats.
         Potential energy is Coulomb pairwise sum: U = sum_{i<j} k qi qj / r_soft
         (Note: r_soft uses softening to avoid singularity.)
+        This is a full O(N^2) pass — only needed when no step has run yet (e.g. at START);
+        inside the loop the sampled values in self.diagnostics are the ones to read.
         """
-        n = len(all_charges)
+        if not all_charges:
+            return 0.0, 0.0
         positions = np.array([p.position for p in all_charges])
         velocities = np.array([p.vel for p in all_charges])
         charges = np.array([p.charge for p in all_charges])
         masses = np.array([p.mass for p in all_charges])
         static_status = np.array([p.static for p in all_charges], dtype=bool)
 
-        # kinetic energy
-        ke = 0.0
-        for i in range(n):
-            v2 = np.dot(velocities[i], velocities[i])
-            ke += 0.5 * masses[i] * v2
-
-        # potential energy (pairwise Coulomb)
-        pe = 0.0
-        for i in range(n):
-            for j in range(i + 1, n):
-                diff = positions[i] - positions[j]
-                r2 = np.dot(diff, diff)
-                # use min fallback and softening consistent with forces
-                if r2 < self.min_r2:
-                    r2 = self.min_r2
-                r = np.sqrt(r2 + self.softening_eps2)
-                pe += K_COULOMB * charges[i] * charges[j] / r
-
+        # same kernel as the forces, so softening/min_r2 can never disagree
+        _, ke, pe = self.get_accelerations(positions, velocities, charges, masses, static_status,
+                                           return_energy=True)
         return ke, pe
 
-    # Helper to step full physics tick: integrate, particle collisions, wall collisions, optional energy print
+    def potential_energy(self, positions, charges, chunk=256):
+        """
+        Softened Coulomb PE U = sum_{i<j} k qi qj / r_soft from positions alone (same min_r2 /
+        softening as get_accelerations), vectorised in row chunks. No forces, so much cheaper than
+        compute_energy().
+        """
+        n = len(positions)
+        pe = 0.0
+        for s in range(0, n, chunk):
+            e = min(s + chunk, n)
+            diff = positions[s:e, None, :] - positions[None, :, :]
+            r2 = np.einsum('ijk,ijk->ij', diff, diff)
+            np.maximum(r2, self.min_r2, out=r2)
+            u = (charges[s:e, None] * charges[None, :]) / np.sqrt(r2 + self.softening_eps2)
+            upper = np.arange(n)[None, :] > np.arange(s, e)[:, None]   # pairs j > i only
+            pe += K_COULOMB * float(np.sum(u[upper]))
+        return pe
+
+    def settled_potential_energy(self):
+        """
+        PE of the current store positions: the force kernel's by-product of the last step, unless
+        wall clamps / collision corrections moved particles after it, then recomputed (and cached)
+        with potential_energy(). None before the first step.
+        """
+        if self._pe_stale and self.last_potential_energy is not None:
+            self.last_potential_energy = self.potential_energy(self.store.positions, self.store.charges)
+            self._pe_stale = False
+        return self.last_potential_energy
+
+    def reset_energy(self):
+        """Forget cached energies, diagnostics and the sim clock (call when the sim is reset or re-started)."""
+        self.last_potential_energy = None
+        self._pe_stale = False
+        self.diagnostics.reset()
+        self.sim_time = 0.0
+        self.step_count = 0
+
+    def begin_diagnostics(self, all_charges):
+        """Full energy pass once at START; later frames are sampled by self.diagnostics."""
+        self.reset_energy()
+        ke, pe = self.compute_energy(all_charges)
+        self.diagnostics.begin(ke, pe)
+        return self.diagnostics.initial_total_energy
+
+    # Helper to step full physics tick: integrate, wall collisions, particle collisions, energy diagnostics
     def step(self, dt, all_charges, wall_cor=1.0, do_collisions=True, do_walls=True, diagnostics=False):
         """
         Convenience function performing:
             - integrate (Velocity-Verlet)
-            - handle particle collisions (if do_collisions)
             - handle wall collisions (if do_walls)
-            - return energy diagnostics if diagnostics True
+            - handle particle collisions (if do_collisions)
+            - sampled energy diagnostics + elastic correction (self.diagnostics)
+            - return (KE, PE) of the latest sample if diagnostics True
         """
         # 1) Integrate
-        self.update_positions_velocities(dt, all_charges)
-
-        # 2) Resolve particle collisions (positional + impulses)
-        if do_collisions:
-            self.handle_particle_collisions(all_charges)
+        with self._phase("physics/integrate"):
+            self.update_positions_velocities(dt, all_charges)
+        self.sim_time += dt
+        self.step_count += 1
+        touch_scene()  # store arrays were written directly, not through the particle setters
 
-        # 3) Wall collisions
+        # 2) Wall collisions
         if do_walls:
-            self.handle_wall_collisions(all_charges, wall_cor)
-
-        # 4) Diagnostics
-        if diagnostics or self.debug:
-            ke, pe = self.compute_energy(all_charges)
-            if self.debug:
-                print(f"[PhysicsEngine] KE: {ke:.6f}  PE: {pe:.6f}  Total: {ke+pe:.6f}")
-            return ke, pe
+            with self._phase("physics/walls"):
+                self.handle_wall_collisions(all_charges, wall_cor)
 
+        # 3) Resolve particle collisions (positional + impulses)
+        if do_collisions:
+            with self._phase("physics/collisions"):
+                self.handle_particle_collisions(all_charges)
+
+        # 4) Diagnostics (every diagnostics.sample_every steps, PE from the force kernel, recomputed
+        #    on those steps if 2) / 3) moved particles)
+        with self._phase("physics/diagnostics"):
+            sampled = self.diagnostics.after_step(self, wall_cor)
+        if self.debug and sampled:
+            d = self.diagnostics
+            print(f"[PhysicsEngine] KE: {d.kinetic_energy:.6f}  PE: {d.potential_energy:.6f}  Total: {d.total_energy:.6f}")
+
+        if diagnostics:
+            return self.diagnostics.kinetic_energy, self.diagnostics.potential_energy
         return None
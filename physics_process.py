@@ -0,0 +1,265 @@
+# below is physics_process.py
+
+# necessary imports
+
+import os
+import sys
+import time
+import pickle
+import threading
+import queue
+import subprocess
+import numpy as np
+
+from constants_for_all_files import *
+from particle_store import StoreBacked, touch_scene
+from shared_state import SharedSnapshot
+
+# Physics in its own process.
+#
+# The pygame process keeps its PointCharge objects for drawing and editing; the child owns the
+# simulation and paces itself to real_time_factor simulated seconds per real second (turbo = flat
+# out). The child publishes positions / velocities / energies to a SharedSnapshot after
+# every step (at most PHYSICS_PROCESS_PUBLISH_HZ times a second) and the render loop copies the
+# latest consistent snapshot into its ParticleStore once per frame. Everything that changes the
+# simulation goes to the child as a command:
+#   ('load', state dict)           full particle state, sent on START
+#   ('params', {'dt':..., 'wall_cor':..., 'real_time_factor':..., 'turbo':...})
+#   ('resume',) / ('pause',) / ('quit',)
+#
+# The child is a plain subprocess reading pickled commands from stdin (not multiprocessing):
+# main.py runs its loop at import time, and a spawn-started multiprocessing child would re-import it.
+
+
+class _Body(StoreBacked):
+    """What PhysicsEngine needs from a particle, without pygame surfaces."""
+
+    def __init__(self, position, vel, charge, mass, static, e, total_radius, pc_id):
+        self._init_state(position, vel)
+        self.charge = charge
+        self.mass = mass
+        self.static = static
+        self.e = e
+        self.total_radius = total_radius
+        self.pc_id = pc_id
+
+
+class PhysicsProcess:
+    """Parent-side handle: starts the child, sends commands, syncs snapshots into the engine."""
+
+    def __init__(self, capacity=PHYSICS_PROCESS_CAPACITY):
+        self.capacity = int(capacity)
+        self.snapshot = None
+        self.proc = None
+        self._sent_params = {}
+        self._last_version = 0
+        self._epoch = 0           # bumped by every load(); the child echoes it in its snapshots
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        if self.alive:
+            return
+        self.snapshot = SharedSnapshot(self.capacity)
+        env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+        script = os.path.abspath(__file__)
+        self.proc = subprocess.Popen([sys.executable, script, self.snapshot.name, str(self.capacity)],
+                                     stdin=subprocess.PIPE, env=env, cwd=os.path.dirname(script))
+        self._sent_params = {}
+        self._last_version = 0
+
+    def stop(self):
+        if self.proc is not None:
+            try:
+                self._send(('quit',))
+                self.proc.stdin.close()
+                self.proc.wait(timeout=2.0)
+            except Exception:
+                self.proc.kill()
+            self.proc = None
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def _send(self, command):
+        pickle.dump(command, self.proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+        self.proc.stdin.flush()
+
+    # ── commands ───────────────────────────────────────────────────────────
+
+    def load(self, all_charges, dt, wall_cor, initial_total_energy=None):
+        """Hand the full particle state to the child (does not start stepping)."""
+        n = len(all_charges)
+        if n > self.capacity:
+            # snapshot block is fixed-size: restart with room to spare
+            self.stop()
+            self.capacity = 1 << (n - 1).bit_length()
+        self.start()
+        state = {
+            'positions': np.array([p.position for p in all_charges], dtype=float),
+            'velocities': np.array([p.vel for p in all_charges], dtype=float),
+            'charges': np.array([p.charge for p in all_charges], dtype=float),
+            'masses': np.array([p.mass for p in all_charges], dtype=float),
+            'static': np.array([p.static for p in all_charges], dtype=bool),
+            'e': np.array([getattr(p, 'e', 1.0) for p in all_charges], dtype=float),
+            'radii': np.array([p.total_radius for p in all_charges], dtype=float),
+            'ids': np.array([getattr(p, 'pc_id', -1) for p in all_charges], dtype=np.int64),
+            'initial_total_energy': initial_total_energy,
+        }
+        # anything the child published before this load (e.g. its pre-RESET state on pause) is
+        # stale: sync() only accepts snapshots carrying the new epoch
+        self._epoch += 1
+        self._send(('load', state, self._epoch))
+        self._sent_params = {}
+        self.set_params(dt=dt, wall_cor=wall_cor)
+
+    def set_params(self, **params):
+        """Send only the parameters whose values changed since the last call."""
+        changed = {k: v for k, v in params.items() if self._sent_params.get(k) != v}
+        if changed and self.alive:
+            self._send(('params', changed))
+            self._sent_params.update(changed)
+
+    def resume(self):
+        if self.alive:
+            self._send(('resume',))
+
+    def pause(self):
+        if self.alive:
+            self._send(('pause',))
+
+    # ── snapshot ───────────────────────────────────────────────────────────
+
+    def sync(self, engine, all_charges):
+        """
+        Copy the newest snapshot into engine.store (and therefore into the PointCharges)
+        and mirror the child's clock / energies onto the engine. Returns the meta dict,
+        or None if nothing new was published.
+        """
+        if self.snapshot is None:
+            return None
+        store = engine.store
+        store.bind(all_charges)
+        meta = self.snapshot.read(min_version=self._last_version)
+        if meta is None:
+            return None
+        self._last_version = meta['version']
+        if int(meta['epoch']) != self._epoch or meta['count'] != len(store):
+            return None  # published before the last load()
+        # two array copies for the whole system
+        store.positions[:] = meta['positions']
+        store.velocities[:] = meta['velocities']
+        touch_scene()
+        engine.sim_time = meta['sim_time']
+        engine.step_count = int(meta['step_count'])
+        engine.last_potential_energy = meta['potential_energy']
+        diag = engine.diagnostics
+        diag.kinetic_energy = meta['kinetic_energy']
+        diag.potential_energy = meta['potential_energy']
+        return meta
+
+
+# ── child process ─────────────────────────────────────────────────────────────
+
+def _read_commands(stream, commands):
+    # Blocking pickle reads on a helper thread so the physics loop never waits on stdin
+    try:
+        while True:
+            commands.put(pickle.load(stream))
+    except (EOFError, OSError, pickle.UnpicklingError):
+        commands.put(('quit',))
+
+
+def _worker(shm_name, capacity):
+    from physics_engine import PhysicsEngine
+
+    snapshot = SharedSnapshot(capacity, name=shm_name)
+    commands = queue.Queue()
+    threading.Thread(target=_read_commands, args=(sys.stdin.buffer, commands), daemon=True).start()
+
+    engine = PhysicsEngine()
+    bodies = []
+    running = False
+    epoch = 0
+    dt = 1 / 1000
+    wall_cor = BW_coeff
+    real_time_factor = SIM_REAL_TIME_FACTOR
+    turbo = False
+    publish_interval = 1.0 / PHYSICS_PROCESS_PUBLISH_HZ
+    last_publish = 0.0
+    next_step = time.perf_counter()
+    rate_window_start, rate_window_steps, steps_per_second = time.perf_counter(), 0, 0.0
+
+    def publish():
+        d = engine.diagnostics
+        snapshot.publish(engine.store.positions, engine.store.velocities,
+                         sim_time=engine.sim_time, step_count=engine.step_count,
+                         kinetic_energy=d.kinetic_energy, potential_energy=d.potential_energy,
+                         initial_total_energy=d.initial_total_energy or 0.0,
+                         steps_per_second=steps_per_second, epoch=epoch)
+
+    while True:
+        # drain commands (block briefly while paused so an idle child doesn't spin)
+        try:
+            command = commands.get(timeout=0.05) if not running else commands.get_nowait()
+        except queue.Empty:
+            command = None
+        while command is not None:
+            kind = command[0]
+            if kind == 'quit':
+                snapshot.close()
+                return
+            if kind == 'load':
+                s = command[1]
+                epoch = command[2]
+                bodies = [_Body(s['positions'][i], s['velocities'][i], s['charges'][i], s['masses'][i],
+                                bool(s['static'][i]), s['e'][i], s['radii'][i], int(s['ids'][i]))
+                          for i in range(len(s['positions']))]
+                engine.store.bind(bodies)
+                engine.begin_diagnostics(bodies)
+                if s.get('initial_total_energy') is not None:
+                    engine.diagnostics.initial_total_energy = s['initial_total_energy']
+                running = False
+                publish()
+            elif kind == 'params':
+                dt = command[1].get('dt', dt)
+                wall_cor = command[1].get('wall_cor', wall_cor)
+                real_time_factor = command[1].get('real_time_factor', real_time_factor)
+                turbo = command[1].get('turbo', turbo)
+            elif kind == 'resume':
+                running = True
+                next_step = time.perf_counter()
+            elif kind == 'pause':
+                running = False
+                publish()
+            try:
+                command = commands.get_nowait()
+            except queue.Empty:
+                command = None
+
+        if not running or not bodies:
+            continue
+
+        # one step of dt every dt / real_time_factor real seconds (turbo = flat out)
+        step_interval = 0.0 if turbo or real_time_factor <= 0 else dt / real_time_factor
+        now = time.perf_counter()
+        if step_interval and now < next_step:
+            time.sleep(min(next_step - now, 0.002))
+            continue
+        next_step = max(next_step + step_interval, now - 0.1)
+
+        engine.step(dt, bodies, wall_cor)
+
+        rate_window_steps += 1
+        if now - rate_window_start >= 1.0:
+            steps_per_second = rate_window_steps / (now - rate_window_start)
+            rate_window_start, rate_window_steps = now, 0
+        if now - last_publish >= publish_interval:
+            last_publish = now
+            publish()
+
+
+if __name__ == "__main__":
+    _worker(sys.argv[1], int(sys.argv[2]))
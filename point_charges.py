@@ -5,7 +5,7 @@
 import pygame 
 import numpy as np
 from constants_for_all_files import *
-from collections import deque
+from particle_store import StoreBacked, SceneCache, scene_property
 
 # --- ARROW CLASS (ENCAPSULATED) ---
 class Arrow:
@@ -45,13 +45,101 @@ class Arrow:
         pygame.draw.polygon(screen, self.color, [end_pos, (p1_x, p1_y), (p2_x, p2_y)])
 
 
+# --- SYSTEM-WIDE SCALE STATS ---
+# Particles are sized / their arrows scaled relative to the whole system (ranges of |charge|, mass
+# and initial speed). The ranges are computed here once per scene version and read by every
+# particle, instead of each particle re-scanning all the others (O(N^2) per update).
+
+class SystemStats:
+
+    def __init__(self):
+        self._scene = SceneCache()
+        self.q_min = self.q_max = 0.0       # |charge|, all particles
+        self.m_min = self.m_max = 0.0       # mass, all particles
+        self.v_min = self.v_max = 0.0       # |vel_0|, all particles (update_arrow)
+        self.dyn_v_min = self.dyn_v_max = 0.0   # |vel_0|, non-static particles (update_relative_scale)
+
+    def update(self, all_charges):
+        if not all_charges or not self._scene.needs_update(all_charges):
+            return self
+        n = len(all_charges)
+        q = np.abs(np.fromiter((pc.charge for pc in all_charges), dtype=float, count=n))
+        m = np.fromiter((pc.mass for pc in all_charges), dtype=float, count=n)
+        static = np.fromiter((pc.static for pc in all_charges), dtype=bool, count=n)
+        v0 = np.linalg.norm(np.array([pc.vel_0 for pc in all_charges], dtype=float).reshape(n, 2), axis=1)
+        self.q_min, self.q_max = float(q.min()), float(q.max())
+        self.m_min, self.m_max = float(m.min()), float(m.max())
+        self.v_min, self.v_max = float(v0.min()), float(v0.max())
+        dyn = v0[~static]
+        self.dyn_v_min, self.dyn_v_max = (float(dyn.min()), float(dyn.max())) if dyn.size else (0, 0)
+        return self
+
+system_stats = SystemStats()
+
+
+# --- PARTICLE SPRITES ---
+# Each particle look (border circle + core circle) is drawn once into a small opaque sprite with an
+# RLE colour key (SPRITE_COLORKEY marks the transparent corners), converted to the screen format
+# and shared by every particle with the same (total radius, core radius, colour, border colour).
+# The radii are drawn as ints anyway, so that is the quantisation. The whole system is then drawn
+# with one Surface.blits call from the positions array (render_particles).
+
+_sprites = {}
+
+def particle_sprite(total_radius, core_radius, color, border_col):
+    key = (int(total_radius), int(core_radius), tuple(color), tuple(border_col))
+    sprite = _sprites.get(key)
+    if sprite is None:
+        R = key[0]
+        # opaque + RLE colour key: the corners are skipped as runs, much cheaper to blit than per-pixel alpha
+        sprite = pygame.Surface((2 * R + 1, 2 * R + 1))
+        sprite.fill(SPRITE_COLORKEY)
+        pygame.draw.circle(sprite, border_col, (R, R), R)
+        pygame.draw.circle(sprite, color, (R, R), key[1])
+        sprite.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()  # screen pixel format: no conversion per blit
+        _sprites[key] = sprite
+    return sprite
+
+
+def render_particles(screen, charges, positions=None):
+    """
+    Draw every particle: arrows first (underneath), then all sprites in one Surface.blits call,
+    then the drag highlight. `positions` is an (N, 2) array in the same order as `charges`
+    (e.g. the bound ParticleStore's), gathered from the particles if not given.
+    """
+    if not charges:
+        return
+    if positions is None:
+        positions = np.array([pc.position for pc in charges], dtype=float)
+
+    for pc in charges:
+        if pc.arrow_display and not pc.static and (pc.vel_0[0] or pc.vel_0[1]):
+            pc.arrow_obj.render(screen)
+
+    radii = np.fromiter((pc.sprite_radius for pc in charges), dtype=np.int64, count=len(charges))
+    corners = positions.astype(np.int64) - radii[:, None]
+    screen.blits(zip([pc.sprite for pc in charges], corners.tolist()), doreturn=False)
+
+    for pc in charges:
+        if pc.dragging:
+            pc.render_highlight(screen)
+
+
+
 # Point Charge Class
 
-class PointCharge:
+class PointCharge(StoreBacked):
+
+    # changing any of these changes the field / relative scales, so they bump the scene version
+    charge = scene_property('charge')
+    mass = scene_property('mass')
+    static = scene_property('static')
 
     def __init__(self, pos_0, charge, mass, environmental, static, pc_id, e, vel0):
-        self.position = np.array(pos_0, dtype=float)
-        self.vel = np.array(vel0, dtype=float)
+        # position / vel are properties (see particle_store.py) so they can be store views
+        self._init_state(pos_0, vel0)
         self.pos_0 = np.array(pos_0, dtype=float)
         self.vel_0 = np.array(vel0, dtype=float)
         self.charge = charge
@@ -74,11 +162,9 @@ class PointCharge:
         else:
             self.color = (80, 80, 80)  # Darker grey for neutral
 
-        # Trails
-        self.history = deque(maxlen=TRAIL_LENGTH)
-        self.frame_counter = 0
-        self.ghost_surf = pygame.Surface((self.total_radius*2, self.total_radius*2), pygame.SRCALPHA)
-        pygame.draw.circle(self.ghost_surf, self.color, (self.total_radius, self.total_radius), int(self.core_radius))
+        self._ghost_key = None
+        self._update_ghost()
+        self._update_sprite()
 
         # --- ARROW SETUP (FIXED) ---
         # Arrow color: black for positive, white for negative
@@ -91,16 +177,35 @@ class PointCharge:
         """Property to always return current position (for compatibility with electric_field.py)."""
         return self.position
     
+    def _update_ghost(self):
+        # rebuilt only when its size / radius / colour actually changed
+        key = (int(self.total_radius), int(self.core_radius), self.color)
+        if key == self._ghost_key:
+            return
+        self._ghost_key = key
+        self.ghost_surf = pygame.Surface((int(self.total_radius*2), int(self.total_radius*2)), pygame.SRCALPHA)
+        pygame.draw.circle(self.ghost_surf, self.color, (int(self.total_radius), int(self.total_radius)), int(self.core_radius))
+
+    def border_color(self):
+        if self.charge > 0: return (220, 90, 90)
+        elif self.charge < 0: return (130, 20, 130)
+        else: return (255, 182, 193)  # Light pink for neutral
+
+    def _update_sprite(self):
+        # shared pre-rendered look for the current radii / colours (see render_particles)
+        self.sprite = particle_sprite(self.total_radius, self.core_radius, self.color, self.border_color())
+        self.sprite_radius = int(self.total_radius)
+
     def update_relative_scale(self, all_charges):
         if not all_charges: return
+        stats = system_stats.update(all_charges)
 
         # --- 1. Radius Calculation (Existing) ---
         # Neutral charges (charge == 0) get middle core radius (12.5px)
         if self.charge == 0:
             self.core_radius = 12.5
         else:
-            max_q = max(abs(pc.charge) for pc in all_charges)
-            min_q = min(abs(pc.charge) for pc in all_charges)
+            max_q, min_q = stats.q_max, stats.q_min
             q_range = max_q - min_q
             
             current_q = abs(self.charge)
@@ -108,8 +213,7 @@ class PointCharge:
             self.core_radius = 5 + (norm_q * 15)
 
         # --- 2. Border Calculation (Existing) ---
-        max_m = max(pc.mass for pc in all_charges)
-        min_m = min(pc.mass for pc in all_charges)
+        max_m, min_m = stats.m_max, stats.m_min
         m_range = max_m - min_m
         
         current_m = self.mass
@@ -117,9 +221,9 @@ class PointCharge:
         self.border_radius = 1 + (norm_m * 4)
         self.total_radius = self.core_radius + self.border_radius
         
-        # Update ghost surf
-        self.ghost_surf = pygame.Surface((int(self.total_radius*2), int(self.total_radius*2)), pygame.SRCALPHA)
-        pygame.draw.circle(self.ghost_surf, self.color, (int(self.total_radius), int(self.total_radius)), int(self.core_radius))
+        # Update ghost surf and sprite
+        self._update_ghost()
+        self._update_sprite()
 
         # --- 3. ARROW UPDATE (New) ---
         # Only update arrows for dynamic particles
@@ -127,12 +231,8 @@ class PointCharge:
             # Get magnitude of initial velocity
             my_vel_mag = np.linalg.norm(self.vel_0)
             
-            # Find max/min velocity in the system for relative scaling
-            velocities = [np.linalg.norm(p.vel_0) for p in all_charges if not p.static]
-            if not velocities:
-                max_v, min_v = 0, 0
-            else:
-                max_v, min_v = max(velocities), min(velocities)
+            # max/min velocity of the dynamic particles in the system for relative scaling
+            max_v, min_v = stats.dyn_v_max, stats.dyn_v_min
             
             # Scale arrow length between 30px and 100px based on relative speed
             v_range = max_v - min_v
@@ -151,12 +251,6 @@ class PointCharge:
         # Always revert to initial state (position and velocity)
         self.position = self.pos_0.copy()
         self.vel = self.vel_0.copy()
-        # also reset trail history when resetting particle
-        try:
-            self.history.clear()
-            self.frame_counter = 0
-        except Exception:
-            pass
 
     # Helper for angle calc
     @staticmethod
@@ -177,9 +271,9 @@ class PointCharge:
         angle = PointCharge.calc_phi(self.vel_0)
 
         # Scaling logic for length
-        # Find max velocity in the system to normalize arrow length
-        max_v0 = max(np.linalg.norm(pc.vel_0) for pc in all_charges)
-        min_v0 = min(np.linalg.norm(pc.vel_0) for pc in all_charges)
+        # Max / min velocity in the system to normalize arrow length (shared, once per scene version)
+        stats = system_stats.update(all_charges)
+        max_v0, min_v0 = stats.v_max, stats.v_min
         
         # Avoid zero range div
         if max_v0 == 0:
@@ -203,62 +297,18 @@ class PointCharge:
         if self.arrow_display and not self.static and np.linalg.norm(self.vel_0) > 0:
             self.arrow_obj.render(screen)
         
-        # Draw Border
-        if self.charge > 0: border_col = (220, 90, 90)
-        elif self.charge < 0: border_col = (130, 20, 130)
-        else: border_col = (255, 182, 193)  # Light pink for neutral
-            
-        pygame.draw.circle(screen, border_col, self.position.astype(int), int(self.total_radius))
-        
-        # Draw Core
-        pygame.draw.circle(screen, self.color, self.position.astype(int), int(self.core_radius))
+        # Border + core (pre-rendered sprite; render_particles draws the whole system in one go)
+        x, y = self.position.astype(int)
+        screen.blit(self.sprite, (x - self.sprite_radius, y - self.sprite_radius))
         
         # Selection Highlight
+        self.render_highlight(screen)
+
+    def render_highlight(self, screen):
         if self.dragging:
             pygame.draw.circle(screen, (255, 255, 255), self.position.astype(int), int(self.total_radius + 2), 2)
             self.position = np.array(pygame.mouse.get_pos(), dtype=float)
 
-    def record_trail(self, enabled=False):
-        """Record current position into history when enabled.
-        Records every TRAIL_SKIP frames. Clears history immediately when disabled.
-        """
-        if enabled:
-            self.frame_counter += 1
-            if self.frame_counter % TRAIL_SKIP == 0:
-                # store a copy to avoid mutation
-                self.history.append(self.position.copy())
-        else:
-            # Clear history immediately when disabled
-            if self.history:
-                self.history.clear()
-            self.frame_counter = 0
-
-    def render_trails(self, screen):
-        """Render the stored trail positions with a simple fade effect.
-        Older positions are more transparent. Uses small temporary surfaces with per-surface alpha.
-        """
-        if not self.history:
-            return
-
-        length = len(self.history)
-        # Draw from oldest to newest so newer points appear on top
-        for i, pos in enumerate(self.history):
-            if length > 1:
-                t = i / (length - 1)
-            else:
-                t = 1.0
-            # Alpha from 40 (oldest) -> 230 (newest)
-            alpha = int(40 + (230 - 40) * t)
-
-            # Draw a small filled circle using a temporary surface to allow alpha
-            r = max(1, int(self.core_radius))
-            surf_size = r * 2 + 4
-            surf = pygame.Surface((surf_size, surf_size), pygame.SRCALPHA)
-            col = (self.color[0], self.color[1], self.color[2], alpha)
-            pygame.draw.circle(surf, col, (surf_size // 2, surf_size // 2), r)
-            blit_pos = (int(pos[0] - surf_size // 2), int(pos[1] - surf_size // 2))
-            screen.blit(surf, blit_pos)
-
     def resolve_collision(self, other):
         """
         Resolves elastic collision with another PointCharge.
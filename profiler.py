@@ -0,0 +1,207 @@
+# below is profiler.py
+
+# necessary imports
+
+import json
+import time
+from collections import deque
+import numpy as np
+import pygame
+from constants_for_all_files import *
+from gui import get_font
+
+# Low-overhead frame-phase timing.
+# Two ways to time a phase:
+#   profiler.lap("name")             -> time since the previous lap/begin_frame (one clock read)
+#   with profiler.phase("name"): ... -> explicit nested section (used inside PhysicsEngine.step)
+# Per-frame totals go into fixed-size ring buffers (rolling mean / p99 overlay, CSV export),
+# and every timed section is kept as a Chrome trace event (chrome://tracing, Perfetto), grouped per
+# frame so the trace always covers the last `history` whole frames however many substeps they ran.
+
+_now_ns = time.perf_counter_ns
+
+
+class _Phase:
+    """Reusable context manager for one named phase (no allocation per use)."""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = _now_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, _now_ns())
+        return False
+
+
+class FrameProfiler:
+
+    def __init__(self, window=PROFILER_WINDOW, history=PROFILER_HISTORY, enabled=True,
+                 frame_events=PROFILER_FRAME_EVENTS):
+        self.window = int(window)      # frames used for the rolling mean / p99
+        self.history = int(history)    # frames kept for export
+        self.enabled = enabled
+        self.overlay_visible = False
+
+        self._phases = {}              # name -> reusable _Phase
+        self._order = []               # phase names in first-seen order (overlay / CSV columns)
+        self._rings = {}               # name -> (history,) float ms per frame
+        self._frame_ms = np.zeros(self.history, dtype=float)
+        self._frame_start_ns = np.zeros(self.history, dtype=np.int64)
+        self.frame_events = int(frame_events)
+        self._frames = deque(maxlen=self.history)   # per recorded frame: ([(name, start_ns, dur_ns)], dropped)
+        self._events = []              # this frame's trace events
+        self._dropped = 0              # events past frame_events this frame (still in the totals)
+
+        self._current = {}             # per-phase ms accumulated this frame
+        self._frame_start = 0
+        self._lap_mark = 0
+        self._origin = _now_ns()
+
+        self.frame_count = 0           # frames recorded in total
+        self._head = 0                 # next ring slot
+
+        # overlay cache (stats are recomputed a few times per second, not every frame)
+        self._font = None
+        self._overlay_surf = None
+        self._overlay_at = 0
+
+    # ── recording ──────────────────────────────────────────────────────────
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current.clear()
+        self._events = []
+        self._dropped = 0
+        self._frame_start = self._lap_mark = _now_ns()
+
+    def lap(self, name):
+        """Charge the time since the last lap (or begin_frame) to `name`."""
+        if not self.enabled:
+            return
+        now = _now_ns()
+        self.record(name, self._lap_mark, now)
+        self._lap_mark = now
+
+    def phase(self, name):
+        p = self._phases.get(name)
+        if p is None:
+            p = self._phases[name] = _Phase(self, name)
+        return p
+
+    def record(self, name, start_ns, end_ns):
+        if not self.enabled:
+            return
+        dur = end_ns - start_ns
+        self._current[name] = self._current.get(name, 0.0) + dur * 1e-6
+        if len(self._events) < self.frame_events:
+            self._events.append((name, start_ns, dur))
+        else:
+            self._dropped += 1
+        if name not in self._rings:
+            self._rings[name] = np.zeros(self.history, dtype=float)
+            self._order.append(name)
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        now = _now_ns()
+        slot = self._head
+        self._frame_ms[slot] = (now - self._frame_start) * 1e-6
+        self._frame_start_ns[slot] = self._frame_start
+        self._events.append(("frame", self._frame_start, now - self._frame_start))
+        self._frames.append((self._events, self._dropped))
+        self._events = []
+        self._dropped = 0
+        current = self._current
+        for name, ring in self._rings.items():
+            ring[slot] = current.get(name, 0.0)
+        self._head = (slot + 1) % self.history
+        self.frame_count += 1
+
+    # ── statistics ─────────────────────────────────────────────────────────
+
+    def _ordered(self, ring, count):
+        """Last `count` frames of a ring, oldest first."""
+        count = min(count, self.frame_count, self.history)
+        idx = (self._head - count + np.arange(count)) % self.history
+        return ring[idx]
+
+    def stats(self):
+        """{name: (mean_ms, p99_ms)} over the rolling window, plus 'frame'."""
+        out = {}
+        if self.frame_count == 0:
+            return out
+        for name in ["frame"] + self._order:
+            ring = self._frame_ms if name == "frame" else self._rings[name]
+            w = self._ordered(ring, self.window)
+            out[name] = (float(np.mean(w)), float(np.percentile(w, 99)))
+        return out
+
+    # ── overlay ────────────────────────────────────────────────────────────
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    def render_overlay(self, screen, pos=(WBT + 10, WBT + 60)):
+        if not self.overlay_visible:
+            return
+        now = _now_ns()
+        if self._overlay_surf is None or now - self._overlay_at > 250_000_000:
+            self._overlay_surf = self._build_overlay()
+            self._overlay_at = now
+        screen.blit(self._overlay_surf, pos)
+
+    def _build_overlay(self):
+        if self._font is None:
+            self._font = get_font('Consolas', 14)
+        lines = [f"{'phase':<22}{'mean':>8}{'p99':>8}  ms"]
+        for name, (mean, p99) in self.stats().items():
+            lines.append(f"{name:<22}{mean:8.2f}{p99:8.2f}")
+        line_h = self._font.get_linesize()
+        width = max(self._font.size(l)[0] for l in lines) + 12
+        surf = pygame.Surface((width, line_h * len(lines) + 10), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 170))
+        for i, text in enumerate(lines):
+            surf.blit(self._font.render(text, True, (220, 255, 220)), (6, 5 + i * line_h))
+        return surf
+
+    # ── export ─────────────────────────────────────────────────────────────
+
+    def export_csv(self, path):
+        """One row per recorded frame (oldest first): frame index, frame ms, then each phase in ms."""
+        count = min(self.frame_count, self.history)
+        first = self.frame_count - count
+        columns = [self._ordered(self._frame_ms, count)] + [self._ordered(self._rings[n], count) for n in self._order]
+        with open(path, "w") as f:
+            f.write(",".join(["frame", "frame_ms"] + self._order) + "\n")
+            for row in range(count):
+                f.write(f"{first + row}," + ",".join(f"{c[row]:.4f}" for c in columns) + "\n")
+        return path
+
+    def export_chrome_trace(self, path):
+        """Chrome trace-event JSON ('X' complete events, microseconds) — open in chrome://tracing or Perfetto."""
+        events = []
+        for frame_events, dropped in self._frames:
+            for name, start, dur in frame_events:
+                event = {
+                    "name": name, "cat": "frame" if name == "frame" else name.split("/")[0], "ph": "X",
+                    "ts": (start - self._origin) / 1000.0, "dur": dur / 1000.0, "pid": 1, "tid": 1,
+                }
+                if name == "frame" and dropped:
+                    event["args"] = {"dropped_events": dropped}
+                events.append(event)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+    def export(self, stem=None):
+        """Write <stem>.csv and <stem>.json; returns both paths."""
+        stem = stem or time.strftime("free1105_profile_%Y%m%d_%H%M%S")
+        return self.export_csv(stem + ".csv"), self.export_chrome_trace(stem + ".json")
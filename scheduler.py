@@ -0,0 +1,106 @@
+# below is scheduler.py
+
+# necessary imports
+
+import time
+from constants_for_all_files import *
+
+# Frame-budget scheduler.
+# Every subsystem of the frame is a task with a priority (lower = more important) and a measured
+# cost (moving average of its run time). Essential tasks (physics, particles) always run; the
+# others are asked first:
+#   scheduler.should_run("heatmap")  -> False when what has been spent this frame, plus the cost
+#                                       still owed to more important tasks later in the frame,
+#                                       plus this task's own cost would overrun the budget
+#   scheduler.stride("trails")       -> degrade instead of skipping: 1, 2, 4 ... (draw every k-th point)
+# A skipped task is deferred, not dropped: after max_skip skipped frames in a row it runs anyway.
+#
+#   scheduler.begin_frame(budget)
+#   scheduler.begin("physics") ... scheduler.end("physics")
+#   scheduler.idle("physics")        # or: not running this frame, nothing to reserve for it
+
+
+class _Task:
+    __slots__ = ('name', 'priority', 'essential', 'max_skip', 'cost', 'skipped', 'ran_frame',
+                 'total_skips', 'start', 'scale')
+
+    def __init__(self, name, priority, essential, max_skip):
+        self.name = name
+        self.priority = priority
+        self.essential = essential
+        self.max_skip = max_skip
+        self.cost = 0.0          # seconds, moving average of a full-quality run
+        self.skipped = 0         # frames skipped in a row
+        self.ran_frame = -1      # last frame it ran in
+        self.total_skips = 0
+        self.start = 0.0
+        self.scale = 1           # stride of the current run (its cost is scaled back up)
+
+
+class FrameScheduler:
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, smoothing=SCHEDULER_SMOOTHING):
+        self.default_budget = budget_ms / 1000.0
+        self.budget = self.default_budget
+        self.smoothing = smoothing
+        self.tasks = {}
+        self.frame = 0
+        self._frame_start = time.perf_counter()
+
+    def add(self, name, priority, essential=False, max_skip=SCHEDULER_MAX_SKIP):
+        self.tasks[name] = _Task(name, priority, essential, max_skip)
+
+    def begin_frame(self, budget=None):
+        """budget: seconds for this frame (None = FRAME_BUDGET_MS)."""
+        self.frame += 1
+        self.budget = self.default_budget if budget is None else budget
+        self._frame_start = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self._frame_start
+
+    def _reserved(self, task):
+        # cost still owed this frame to more important tasks that haven't run yet
+        return sum(t.cost for t in self.tasks.values()
+                   if t.priority < task.priority and t.ran_frame != self.frame)
+
+    def _fits(self, task, cost):
+        return self.elapsed() + self._reserved(task) + cost <= self.budget
+
+    def should_run(self, name):
+        task = self.tasks[name]
+        if task.essential or task.skipped >= task.max_skip or self._fits(task, task.cost):
+            return True
+        task.skipped += 1
+        task.total_skips += 1
+        return False
+
+    def stride(self, name, max_stride=SCHEDULER_MAX_STRIDE):
+        """Largest-quality stride (1, 2, 4 ...) whose share of the task's cost fits the budget."""
+        task = self.tasks[name]
+        stride = 1
+        while stride < max_stride and not self._fits(task, task.cost / stride):
+            stride *= 2
+        return stride
+
+    def begin(self, name, stride=1):
+        task = self.tasks[name]
+        task.scale = stride
+        task.start = time.perf_counter()
+
+    def end(self, name):
+        task = self.tasks[name]
+        cost = (time.perf_counter() - task.start) * task.scale
+        a = self.smoothing
+        task.cost = cost if task.ran_frame < 0 else (1 - a) * task.cost + a * cost
+        task.ran_frame = self.frame
+        task.skipped = 0
+
+    def idle(self, name):
+        """`name` won't run this frame (e.g. physics while paused): stop reserving its cost for it."""
+        self.tasks[name].ran_frame = self.frame
+
+    def stats(self):
+        """name -> (cost ms, skips so far), most important first."""
+        return {t.name: (t.cost * 1000.0, t.total_skips)
+                for t in sorted(self.tasks.values(), key=lambda t: t.priority)}
@@ -0,0 +1,67 @@
+# below is shared_state.py
+
+# necessary imports
+
+import numpy as np
+from state_bus import StateBus
+
+# Particle snapshot the physics child publishes for the main process: a shared-memory StateBus
+# (double-buffered, seqlock-guarded; see state_bus.py for the protocol and block layout) with
+# positions / velocities and the engine's clock and energies as meta values.
+#
+# Unlike a plain StateBus the block never grows: the child attaches to it by name once, so
+# publishing more than `capacity` particles is an error (PhysicsProcess restarts the child with a
+# bigger block instead).
+
+META_FIELDS = ('count', 'version', 'sim_time', 'step_count', 'kinetic_energy', 'potential_energy',
+               'initial_total_energy', 'steps_per_second', 'epoch')
+
+SNAPSHOT_FIELDS = (
+    ('positions', (2,), np.float64),
+    ('velocities', (2,), np.float64),
+)
+
+
+class SharedSnapshot:
+
+    def __init__(self, capacity, name=None):
+        """
+        capacity: max particles a snapshot can hold.
+        name: None creates a new block, otherwise attach to the existing block `name`.
+        """
+        self.bus = StateBus(capacity, SNAPSHOT_FIELDS, shared=True, name=name, meta_fields=META_FIELDS)
+        self.capacity = self.bus.capacity
+        self.owner = self.bus.owner
+
+    @property
+    def name(self):
+        return self.bus.name
+
+    # ── writer side ────────────────────────────────────────────────────────
+
+    def publish(self, positions, velocities, **meta):
+        n = len(positions)
+        if n > self.capacity:
+            raise ValueError(f"snapshot holds {self.capacity} particles, got {n}")
+        self.bus.publish(n, positions=positions, velocities=velocities, **meta)
+
+    # ── reader side ────────────────────────────────────────────────────────
+
+    def read(self, positions_out=None, velocities_out=None, min_version=0, retries=64):
+        """
+        Copy the latest consistent snapshot. Returns a dict of the meta fields
+        (plus 'positions' / 'velocities' arrays) or None if nothing newer than
+        `min_version` has been published. Passing preallocated *_out arrays of
+        the right length avoids allocation.
+        """
+        out = {'positions': positions_out, 'velocities': velocities_out}
+        meta = self.bus.read_into(out, min_version, retries)
+        if meta is None:
+            return None
+        n = meta['count']
+        meta['positions'] = out['positions'][:n]
+        meta['velocities'] = out['velocities'][:n]
+        return meta
+
+    def close(self):
+        self.bus.close()
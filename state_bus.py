@@ -0,0 +1,245 @@
+# below is state_bus.py
+
+# necessary imports
+
+import numpy as np
+from multiprocessing import shared_memory
+
+# Versioned, double-buffered, seqlock-guarded state publication: any set of named NumPy fields and
+# meta values, with either local or shared-memory backing (shared_state.SharedSnapshot is one of
+# these with the physics child's fields).
+#
+#   bus = StateBus(capacity)                              # writer (main loop)
+#   bus.publish(count, sim_time=t, positions=..., charges=...)
+#
+#   snap = bus.latest(min_version=last_seen)              # any reader: None if nothing new
+#   snap['positions']                                     # zero-copy view of the front buffer
+#   if bus.valid(snap): ...                               # still untorn after using it?
+#   bus.read_into(out, min_version)                       # or copy into preallocated arrays
+#
+# Layout of the block (8-byte aligned):
+#   control  int64[4]        : [front buffer index, seq of buffer 0, seq of buffer 1, capacity]
+#   buffer b (x2)            : meta float64[len(meta_fields)], then each field (capacity, *shape)
+# The writer bumps seq[b] to odd, fills the back buffer b, bumps seq[b] to even and flips `front`,
+# so a reader holding the front buffer is only disturbed by a second publish (valid() catches it).
+
+# meta values published with every buffer ('count' and 'version' are required, the bus sets them)
+META_FIELDS = ('count', 'version', 'sim_time', 'scene_version', 'frame')
+_CONTROL_LEN = 4
+
+# what the render loop publishes for every particle
+PARTICLE_FIELDS = (
+    ('positions', (2,), np.float64),
+    ('velocities', (2,), np.float64),
+    ('charges', (), np.float64),
+    ('radii', (), np.float64),
+    ('ids', (), np.int64),
+)
+
+
+def _field_bytes(capacity, shape, dtype):
+    n = capacity * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    return (n + 7) // 8 * 8
+
+
+def _block_size(capacity, fields, meta_fields):
+    per_buffer = 8 * len(meta_fields) + sum(_field_bytes(capacity, s, d) for _, s, d in fields)
+    return 8 * _CONTROL_LEN + 2 * per_buffer
+
+
+class BusSnapshot:
+    """Zero-copy views of one published buffer (first `count` rows of every field) plus its meta."""
+    __slots__ = ('buffer', 'seq', 'generation', 'meta', 'arrays')
+
+    def __init__(self, buffer, seq, generation, meta, arrays):
+        self.buffer = buffer
+        self.seq = seq
+        self.generation = generation
+        self.meta = meta
+        self.arrays = arrays
+
+    @property
+    def version(self):
+        return self.meta['version']
+
+    @property
+    def count(self):
+        return self.meta['count']
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+
+class StateBus:
+
+    def __init__(self, capacity, fields=PARTICLE_FIELDS, shared=False, name=None, meta_fields=META_FIELDS):
+        """
+        capacity: max rows per field.
+        meta_fields: names of the per-publish float64 meta values (must include count and version).
+        shared: back the bus with shared memory (readers in other processes attach with `name`).
+        name: attach to the existing shared block `name` instead of creating one.
+        """
+        self.fields = tuple(fields)
+        self.meta_fields = tuple(meta_fields)
+        self._meta_index = {key: i for i, key in enumerate(self.meta_fields)}
+        self.shared = shared or name is not None
+        self.owner = name is None
+        self.generation = 0      # bumped whenever the buffers are reallocated (resize)
+        self._version = 0
+        self.shm = None
+        self._allocate(int(capacity), name)
+
+    def _allocate(self, capacity, name=None):
+        # everything is built first and swapped in at the end, so a reader thread of a local bus
+        # never sees half-built state during a resize
+        size = _block_size(capacity, self.fields, self.meta_fields)
+        shm = None
+        if not self.shared:
+            buf = memoryview(bytearray(size))
+        elif name is None:
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            buf = shm.buf
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            _untrack(shm)
+            buf = shm.buf
+
+        control = np.ndarray((_CONTROL_LEN,), dtype=np.int64, buffer=buf)
+        metas = []
+        buffers = []
+        offset = 8 * _CONTROL_LEN
+        for _ in range(2):
+            metas.append(np.ndarray((len(self.meta_fields),), dtype=np.float64, buffer=buf, offset=offset))
+            offset += 8 * len(self.meta_fields)
+            arrays = {}
+            for field, shape, dtype in self.fields:
+                arrays[field] = np.ndarray((capacity,) + tuple(shape), dtype=dtype, buffer=buf, offset=offset)
+                offset += _field_bytes(capacity, shape, dtype)
+            buffers.append(arrays)
+
+        if self.owner:
+            control[:] = (0, 0, 0, capacity)
+            for m in metas:
+                m[:] = 0.0
+
+        self.shm = shm
+        self.capacity = capacity
+        self._meta = metas
+        self._arrays = buffers
+        self.control = control
+
+    @property
+    def name(self):
+        return self.shm.name if self.shm is not None else None
+
+    @property
+    def version(self):
+        return self._version
+
+    # ── writer side ────────────────────────────────────────────────────────
+
+    def resize(self, capacity):
+        """Reallocate for `capacity` rows (shared buses get a new block: readers must re-attach by name)."""
+        old_shm = self.shm
+        self.generation += 1
+        self._allocate(int(capacity))
+        if old_shm is not None:
+            old_shm.close()
+            old_shm.unlink()
+
+    def publish(self, count, **values):
+        """
+        Write `count` rows of the given fields (missing fields keep stale rows) and any meta fields
+        given as keywords into the back buffer, then make it the front buffer. Grows the bus when
+        needed (a shared bus then has a new name and generation; see resize).
+        """
+        if count > self.capacity:
+            self.resize(1 << (count - 1).bit_length())
+        back = 1 - int(self.control[0])
+        seq = 1 + back
+        self.control[seq] += 1                       # odd: write in progress
+        arrays = self._arrays[back]
+        m = self._meta[back]
+        for key, value in values.items():
+            if key in arrays:
+                arrays[key][:count] = value
+            else:
+                m[self._meta_index[key]] = value
+        self._version += 1
+        m[self._meta_index['count']] = count
+        m[self._meta_index['version']] = self._version
+        self.control[seq] += 1                       # even: consistent
+        self.control[0] = back                       # readers now see this buffer
+        return self._version
+
+    # ── reader side ────────────────────────────────────────────────────────
+
+    def latest(self, min_version=0, retries=64):
+        """Zero-copy snapshot of the front buffer, or None if nothing newer than `min_version`."""
+        for _ in range(retries):
+            front = int(self.control[0])
+            s1 = int(self.control[1 + front])
+            if s1 & 1:
+                continue
+            m = self._meta[front]
+            version = int(m[self._meta_index['version']])
+            if version <= min_version:
+                return None
+            meta = {key: float(m[i]) for i, key in enumerate(self.meta_fields)}
+            meta['count'] = n = int(meta['count'])
+            meta['version'] = version
+            arrays = {field: a[:n] for field, a in self._arrays[front].items()}
+            snap = BusSnapshot(front, s1, self.generation, meta, arrays)
+            if self.valid(snap):
+                return snap
+        return None
+
+    def valid(self, snap):
+        """True if the buffer behind `snap` has not been rewritten since it was taken."""
+        return (snap.generation == self.generation and self.control is not None
+                and int(self.control[1 + snap.buffer]) == snap.seq)
+
+    def read_into(self, out, min_version=0, retries=64):
+        """
+        Copy the latest snapshot into the preallocated arrays in `out` (dict field -> array with
+        room for `count` rows; missing / too small entries are (re)allocated). Returns the meta
+        dict or None if nothing newer than `min_version` was published.
+        """
+        for _ in range(retries):
+            snap = self.latest(min_version, retries=1)
+            if snap is None:
+                if int(self.control[1 + int(self.control[0])]) & 1:
+                    continue  # caught the writer mid-publish
+                return None
+            n = snap.count
+            for field, view in snap.arrays.items():
+                dst = out.get(field)
+                if dst is None or len(dst) < n:
+                    dst = out[field] = np.empty((max(n, 1),) + view.shape[1:], dtype=view.dtype)
+                dst[:n] = view
+            if self.valid(snap):
+                return snap.meta
+        return None
+
+    def _release(self):
+        # drop our numpy views before closing the mapping
+        self.control = None
+        self._meta = self._arrays = None
+        if self.shm is not None:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        self._release()
+
+
+def _untrack(shm):
+    # Python < 3.13 registers attached blocks with this process's resource tracker,
+    # which would unlink the block when the attaching process exits.
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
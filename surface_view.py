@@ -0,0 +1,247 @@
+# below is surface_view.py
+
+# necessary imports
+
+import math
+import pygame
+import numpy as np
+from constants_for_all_files import *
+from gui import get_font, render_text
+from phase4_visualiser import potential_grid  # no matplotlib until its window opens
+
+# Phase 4 without matplotlib: the potential surface drawn by a small NumPy software renderer into a
+# viewport inside the pygame window (bottom right, F4 = show / hide in main.py).
+#
+# Every redraw is a handful of whole-array passes over the (GRID, GRID) mesh:
+#   V (chunked sum of kq/r) -> normalise -> heights -> rotate + perspective-project all vertices
+#   -> per-quad Lambert shade and depth (mean of its 4 corners) -> argsort far-to-near
+# and then one pygame.draw.polygon per quad in that order (painter's algorithm; the surface is a
+# height field, so sorting quads by depth is enough). Wireframe and charge markers go on top, like
+# the matplotlib window. Redraws only happen when the bus version or the camera moved, every other
+# frame is one blit of the cached viewport.
+#
+# Mouse: drag inside the viewport to orbit, wheel to zoom.
+#
+#   view = SurfaceView()
+#   view.attach(state_bus)              # same attach / start / stop as Phase4Visualiser
+#   view.handle_event(event)            # True if the viewport used the event
+#   view.render(screen)                 # or view.render_cached(screen) while not view.stale
+
+
+class SurfaceView:
+
+    def __init__(self, rect=SURFACE_VIEW_RECT, grid_res=SURFACE_VIEW_GRID):
+        self.rect = pygame.Rect(rect)
+        self.grid_res = grid_res
+        self.visible = False                  # start() / stop() show and hide it
+        self.azimuth = math.radians(-60.0)    # same default camera as matplotlib's 3D axes
+        self.elevation = math.radians(30.0)
+        self.zoom = 1.0
+        self._bus = None
+        self._drawn_version = 0
+        self._dirty = True                    # camera / size changed: re-project the cached mesh
+        self._orbiting = False
+        self._surface = None                  # created on first render
+
+        # mesh in world units: x in [-0.5, 0.5], y scaled by the screen's aspect and flipped so the
+        # top-down view matches the 2D window; z = normalised potential * SURFACE_VIEW_HEIGHT
+        xs = np.linspace(0, SW, grid_res)
+        ys = np.linspace(0, SH, grid_res)
+        self._grid_x, self._grid_y = np.meshgrid(xs, ys)
+        self._world = np.zeros((grid_res, grid_res, 3))
+        self._world[..., 0] = self._grid_x / SW - 0.5
+        self._world[..., 1] = (0.5 - self._grid_y / SH) * (SH / SW)
+
+        # quad k = cell (i, j) with corners (i,j) (i,j+1) (i+1,j+1) (i+1,j), as flat vertex indices
+        i, j = np.meshgrid(np.arange(grid_res - 1), np.arange(grid_res - 1), indexing='ij')
+        base = (i * grid_res + j).ravel()
+        self._quads = np.stack([base, base + 1, base + grid_res + 1, base + grid_res], axis=1)
+
+        # per-update state (filled from the bus)
+        self._v_norm = np.zeros((grid_res, grid_res))
+        self._charges = np.zeros((0, 3))      # (x, y, z) world position of each charge marker
+        self._signs = np.zeros(0)
+
+    # ── Phase4Visualiser-compatible API ──────────────────────────────────────
+
+    def attach(self, bus):
+        """Read charges from `bus` (a StateBus with positions / charges / radii)."""
+        self._bus = bus
+        self._drawn_version = 0
+
+    @property
+    def alive(self):
+        return self.visible
+
+    def start(self):
+        # nothing to spawn: drawing happens in render(); redraw from the latest bus version
+        self.visible = True
+        self._drawn_version = 0
+
+    def stop(self):
+        self.visible = False
+        self._orbiting = False
+
+    # ── input ────────────────────────────────────────────────────────────────
+
+    def handle_event(self, event):
+        """Orbit / zoom; returns True when the event belonged to the viewport."""
+        if not self.visible:
+            return False
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.rect.collidepoint(event.pos):
+            self._orbiting = True
+            return True
+        if event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self._orbiting:
+            self._orbiting = False
+            return True
+        if event.type == pygame.MOUSEMOTION and self._orbiting:
+            dx, dy = event.rel
+            self.azimuth -= dx * SURFACE_VIEW_ORBIT_SPEED
+            self.elevation = min(math.pi / 2, max(-math.pi / 2, self.elevation + dy * SURFACE_VIEW_ORBIT_SPEED))
+            self._dirty = True
+            return True
+        if event.type == pygame.MOUSEWHEEL and self.rect.collidepoint(pygame.mouse.get_pos()):
+            self.zoom = min(4.0, max(0.25, self.zoom * 1.1 ** event.y))
+            self._dirty = True
+            return True
+        # clicks inside the viewport shouldn't reach the particles underneath; button-ups always go
+        # through (unless they end an orbit) so a particle / slider drag released over the viewport
+        # still lets go
+        return event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos)
+
+    # ── data ─────────────────────────────────────────────────────────────────
+
+    def _pull(self):
+        """Recompute the surface from the bus if a newer version was published. True if it changed."""
+        if self._bus is None:
+            return False
+        snap = self._bus.latest(min_version=self._drawn_version)
+        if snap is None:
+            return False
+        pos = snap['positions']
+        q = snap['charges']
+        V = potential_grid(self._grid_x, self._grid_y, pos[:, 0], pos[:, 1], q, snap['radii'])
+        px, py, q = pos[:, 0].copy(), pos[:, 1].copy(), q.copy()
+        if not self._bus.valid(snap):
+            return False  # torn by two publishes in a row: take the newer one next frame
+        self._drawn_version = snap.version
+
+        v_abs_max = np.max(np.abs(V)) if V.size else 0.0
+        np.divide(V, v_abs_max if v_abs_max > 0 else 1.0, out=self._v_norm)
+        np.clip(self._v_norm, -1.0, 1.0, out=self._v_norm)
+        self._world[..., 2] = self._v_norm * SURFACE_VIEW_HEIGHT
+
+        # markers sit on the nearest grid point, like the matplotlib view
+        n = self.grid_res
+        ix = np.clip((px / SW * (n - 1)).astype(int), 0, n - 1)
+        iy = np.clip((py / SH * (n - 1)).astype(int), 0, n - 1)
+        self._charges = self._world[iy, ix].copy()
+        self._charges[:, 2] += 0.02
+        self._signs = np.sign(q)
+        return True
+
+    # ── projection ───────────────────────────────────────────────────────────
+
+    def _project(self, points):
+        """
+        World (..., 3) -> screen (..., 2) in viewport pixels, plus closeness to the camera (larger = nearer).
+        Turn about z by the azimuth, tilt by the elevation, then a mild perspective divide.
+        """
+        ca, sa = math.cos(self.azimuth), math.sin(self.azimuth)
+        ce, se = math.cos(self.elevation), math.sin(self.elevation)
+        x, y, z = points[..., 0], points[..., 1], points[..., 2]
+        x1 = x * ca - y * sa
+        y1 = x * sa + y * ca
+        up = y1 * se + z * ce
+        near = z * se - y1 * ce
+        scale = (self.zoom * self.rect.width * 0.95) * SURFACE_VIEW_DISTANCE / (SURFACE_VIEW_DISTANCE - near)
+        screen = np.empty(points.shape[:-1] + (2,))
+        screen[..., 0] = self.rect.width / 2 + x1 * scale
+        screen[..., 1] = self.rect.height / 2 - up * scale
+        return screen, near
+
+    def _light(self):
+        # fixed in camera space (over the viewer's left shoulder) so the lit side follows the orbit
+        ca, sa = math.cos(self.azimuth), math.sin(self.azimuth)
+        ce, se = math.cos(self.elevation), math.sin(self.elevation)
+        lx, ly, lz = -0.4, 0.5, 0.75                     # camera space: right, up, towards viewer
+        y1 = ly * se - lz * ce                            # inverse of the tilt in _project
+        z = ly * ce + lz * se
+        light = np.array([lx * ca + y1 * sa, -lx * sa + y1 * ca, z])
+        return light / np.linalg.norm(light)
+
+    # ── drawing ──────────────────────────────────────────────────────────────
+
+    def _redraw(self):
+        surf = self._surface
+        surf.fill(SURFACE_VIEW_BG)
+        if not len(self._signs):
+            self._draw_title(0, 0)
+            return
+
+        verts = self._world.reshape(-1, 3)
+        screen, near = self._project(verts)
+        corners = verts[self._quads]                          # (Q, 4, 3)
+
+        # Lambert shading on the face normal (two-sided: the surface is seen from below too)
+        normals = np.cross(corners[:, 2] - corners[:, 0], corners[:, 3] - corners[:, 1])
+        normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+        shade = SURFACE_VIEW_AMBIENT + (1.0 - SURFACE_VIEW_AMBIENT) * np.abs(normals @ self._light())
+
+        # grey from the potential, same mapping as the matplotlib view / 2D heatmap (positive = dark)
+        grey = 0.5 - 0.5 * self._v_norm.ravel()[self._quads].mean(axis=1)
+        colours = np.clip(grey * shade * 255.0, 0, 255).astype(np.uint8)
+
+        order = np.argsort(near[self._quads].mean(axis=1))   # far to near
+        polygons = screen[self._quads[order]].tolist()
+        draw_polygon = pygame.draw.polygon
+        for c, points in zip(colours[order].tolist(), polygons):
+            draw_polygon(surf, (c, c, c), points)
+
+        # wireframe: every grid row and column as one polyline
+        n = self.grid_res
+        grid = screen.reshape(n, n, 2)
+        for line in grid.tolist() + grid.transpose(1, 0, 2).tolist():
+            pygame.draw.lines(surf, SURFACE_VIEW_WIRE, False, line)
+
+        # charge markers (nearest first would hide the far ones, so far to near like the quads)
+        points, closeness = self._project(self._charges)
+        radius = max(2, int(4 * self.zoom))
+        for k in np.argsort(closeness):
+            sign = self._signs[k]
+            colour = COL_POS_MARKER if sign > 0 else COL_NEG_MARKER if sign < 0 else COL_NEUTRAL_MARKER
+            pygame.draw.circle(surf, colour, points[k], radius)
+
+        self._draw_title(int(np.count_nonzero(self._signs > 0)), int(np.count_nonzero(self._signs < 0)))
+
+    def _draw_title(self, n_pos, n_neg):
+        text = f"Electric Potential  |  +{n_pos}   −{n_neg}" if n_pos or n_neg else "No charges present"
+        self._surface.blit(render_text(get_font('Arial', 13), text, (255, 255, 255)), (8, 6))
+
+    @property
+    def stale(self):
+        """True if render() would redraw: a newer bus version or a camera change."""
+        return self._dirty or self._surface is None or (self._bus is not None
+                                                        and self._bus.version > self._drawn_version)
+
+    def render_cached(self, screen):
+        """Blit the last drawn viewport without reading the bus (frame over budget / nothing new)."""
+        if not self.visible:
+            return
+        if self._surface is None:
+            self.render(screen)
+            return
+        screen.blit(self._surface, self.rect)
+        pygame.draw.rect(screen, SURFACE_VIEW_WIRE, self.rect, 1)
+
+    def render(self, screen):
+        if not self.visible:
+            return
+        if self._surface is None or self._surface.get_size() != self.rect.size:
+            self._surface = pygame.Surface(self.rect.size)
+            self._dirty = True
+        if self._pull() or self._dirty:
+            self._dirty = False
+            self._redraw()
+        screen.blit(self._surface, self.rect)
+        pygame.draw.rect(screen, SURFACE_VIEW_WIRE, self.rect, 1)
@@ -0,0 +1,119 @@
+# below is telemetry.py
+
+# necessary imports
+
+import time
+import numpy as np
+from constants_for_all_files import *
+
+# Structured particle telemetry.
+# Replaces the old "print every particle every frame" dump (terminal I/O capped the FPS):
+# - particle state is written as fixed-size binary records at TELEMETRY_RATE_HZ
+#   into an in-memory ring buffer and, optionally, appended to a file
+# - the console only gets a one-line summary every TELEMETRY_SUMMARY_SECONDS
+#   (verbosity 2 adds the per-particle lines, at the same summary rate)
+#
+# Read a telemetry file back with load_telemetry(path).
+
+TELEMETRY_DTYPE = np.dtype([
+    ('frame', '<i8'),        # main-loop frame number
+    ('sim_time', '<f8'),     # simulated seconds since START
+    ('pc_id', '<i8'),
+    ('pos', '<f8', (2,)),
+    ('vel', '<f8', (2,)),
+])
+
+# verbosity levels
+QUIET = 0      # nothing on the console
+SUMMARY = 1    # periodic one-line summaries
+VERBOSE = 2    # summaries + per-particle lines (still rate limited)
+
+
+def load_telemetry(path):
+    """Structured array of every record in a telemetry file."""
+    return np.fromfile(path, dtype=TELEMETRY_DTYPE)
+
+
+class TelemetrySink:
+
+    def __init__(self, rate_hz=TELEMETRY_RATE_HZ, verbosity=TELEMETRY_VERBOSITY, path=TELEMETRY_PATH,
+                 capacity=TELEMETRY_CAPACITY, summary_seconds=TELEMETRY_SUMMARY_SECONDS):
+        self.rate_hz = rate_hz
+        self.verbosity = verbosity
+        self.summary_seconds = summary_seconds
+        self.ring = np.zeros(int(capacity), dtype=TELEMETRY_DTYPE)
+        self.head = 0              # next record slot in the ring
+        self.records_written = 0
+        self.path = path
+        self._file = open(path, "ab") if path else None
+        self._last_record = -float("inf")
+        self._last_summary = time.perf_counter()
+
+    def set_verbosity(self, verbosity):
+        self.verbosity = int(verbosity)
+
+    def record(self, frame, sim_time, store, diagnostics=None):
+        """
+        Rate-limited snapshot of every particle in `store` (a bound ParticleStore).
+        Cheap when it's not time yet: one clock read.
+        """
+        now = time.perf_counter()
+        if self.rate_hz and now - self._last_record >= 1.0 / self.rate_hz:
+            self._last_record = now
+            self._write(frame, sim_time, store)
+        if self.verbosity >= SUMMARY and now - self._last_summary >= self.summary_seconds:
+            self._last_summary = now
+            self._print_summary(frame, sim_time, store, diagnostics)
+
+    def _write(self, frame, sim_time, store):
+        n = len(store)
+        if n == 0:
+            return
+        records = np.empty(n, dtype=TELEMETRY_DTYPE)
+        records['frame'] = frame
+        records['sim_time'] = sim_time
+        records['pc_id'] = store.ids
+        records['pos'] = store.positions
+        records['vel'] = store.velocities
+
+        # ring buffer (wraps; keeps only the newest `capacity` records)
+        cap = len(self.ring)
+        if n >= cap:
+            self.ring[:] = records[-cap:]
+            self.head = 0
+        else:
+            first = min(n, cap - self.head)
+            self.ring[self.head:self.head + first] = records[:first]
+            self.ring[:n - first] = records[first:]
+            self.head = (self.head + n) % cap
+        self.records_written += n
+
+        if self._file is not None:
+            self._file.write(records.tobytes())
+
+    def _print_summary(self, frame, sim_time, store, diagnostics):
+        n = len(store)
+        line = f"[telemetry] frame {frame}  t={sim_time:.4f}s  N={n}"
+        if n:
+            speeds = np.sqrt(np.einsum('ij,ij->i', store.velocities, store.velocities))
+            line += f"  max|v|={speeds.max():.3e}  mean|v|={speeds.mean():.3e}"
+        if diagnostics is not None and diagnostics.initial_total_energy is not None:
+            drift = diagnostics.total_energy - diagnostics.initial_total_energy
+            line += f"  E={diagnostics.total_energy:.4e} J  drift={drift:+.2e} J"
+        line += f"  records={self.records_written}"
+        print(line)
+
+        if self.verbosity >= VERBOSE:
+            for i in range(n):
+                print(f"  ID {store.ids[i]}: Pos {store.positions[i]}, Vel {store.velocities[i]}")
+
+    def latest(self):
+        """Ring contents, oldest record first (a copy)."""
+        if self.records_written < len(self.ring):
+            return self.ring[:self.head].copy()
+        return np.roll(self.ring, -self.head)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,97 @@
+# below is timestep.py
+
+# necessary imports
+
+import time
+from constants_for_all_files import *
+from particle_store import touch_scene
+
+# Fixed-timestep scheduler.
+# Physics always advances in steps of exactly `dt` (the dt slider); how many steps run per
+# rendered frame comes from wall-clock time * real-time factor (simulated seconds per real
+# second), so simulated speed no longer depends on the FPS slider.
+# Positions are drawn interpolated between the last two physics states (alpha = leftover
+# accumulator / dt), which keeps motion smooth when K varies frame to frame.
+#
+# Turbo: physics runs flat out (steps for TURBO_STEP_BUDGET_MS per loop iteration, no FPS cap)
+# and only every TURBO_RENDER_EVERY-th iteration is drawn.
+
+class FixedTimestep:
+
+    def __init__(self, real_time_factor=SIM_REAL_TIME_FACTOR, max_substeps=MAX_SUBSTEPS_PER_FRAME):
+        self.real_time_factor = real_time_factor
+        self.max_substeps = max_substeps
+        self.turbo = False
+        self.accumulator = 0.0   # simulated seconds owed to the physics
+        self.alpha = 1.0         # interpolation weight of the current state
+        self.frames = 0          # loop iterations since the last reset (turbo render skipping)
+        self.dropped_steps = 0   # steps discarded because the frame couldn't keep up
+        self._last = None
+        self._previous = None    # positions before the last substep
+        self._saved = None       # true positions while interpolated ones are on display
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.frames = 0
+        self._last = None
+        self._previous = None
+
+    def toggle_turbo(self):
+        self.turbo = not self.turbo
+        self._last = None
+
+    def substeps(self, dt):
+        """How many physics steps of size dt to run this frame."""
+        now = time.perf_counter()
+        elapsed = 0.0 if self._last is None else min(now - self._last, MAX_FRAME_SECONDS)
+        self._last = now
+        self.frames += 1
+
+        if self.turbo:
+            self.alpha = 1.0
+            return -1  # caller runs steps until turbo_deadline()
+
+        self.accumulator += elapsed * self.real_time_factor
+        k = int(self.accumulator // dt)
+        if k > self.max_substeps:
+            # can't keep up: run the cap and forget the backlog (no spiral of death)
+            self.dropped_steps += k - self.max_substeps
+            k = self.max_substeps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= k * dt
+        self.alpha = min(1.0, self.accumulator / dt)
+        return k
+
+    def turbo_deadline(self):
+        return time.perf_counter() + TURBO_STEP_BUDGET_MS / 1000.0
+
+    def should_render(self):
+        return not self.turbo or self.frames % TURBO_RENDER_EVERY == 0
+
+    # ── interpolation ──────────────────────────────────────────────────────
+
+    def save_previous(self, positions):
+        """Call right before the last substep of a frame."""
+        if self._previous is None or self._previous.shape != positions.shape:
+            self._previous = positions.copy()
+        else:
+            self._previous[:] = positions
+
+    def begin_interpolation(self, store):
+        """Put prev + alpha * (current - prev) into store.positions for drawing."""
+        prev = self._previous
+        if self.alpha >= 1.0 or prev is None or prev.shape != store.positions.shape:
+            return
+        self._saved = store.positions.copy()
+        store.positions += (1.0 - self.alpha) * (prev - store.positions)
+        touch_scene()
+
+    def end_interpolation(self, store):
+        """Restore the true physics positions."""
+        if self._saved is not None:
+            if self._saved.shape == store.positions.shape:
+                store.positions[:] = self._saved
+                touch_scene()
+            self._saved = None
@@ -0,0 +1,265 @@
+# below is trails.py
+
+# necessary imports
+
+import math
+import pygame
+import numpy as np
+from collections import deque
+from constants_for_all_files import *
+
+# Two ways of drawing trails, picked by TRAIL_MODE in main.py. Both take the positions straight from
+# the ParticleStore and share record / render / clear.
+
+# Accumulated trails ("layer").
+# Instead of keeping past positions and redrawing all of them every frame (TrailHistory below),
+# every particle stamps its current position into one persistent SRCALPHA layer every TRAIL_SKIP
+# frames, and the whole layer is faded just before each stamp by subtracting a constant from its
+# alpha (one BLEND_RGBA_SUB blit of a constant surface: SIMD in pygame, ~20x cheaper than
+# Surface.fill with the same flag). Old stamps simply fade out, so a frame costs one fade + N draws
+# + one blit whatever the trail length.
+#
+#   style "dots"     : a disc per stamp
+#   style "polyline" : a line segment from each particle's previous stamp to the current one
+#
+#   layer.record(all_point_charges, store.positions)   # while running
+#   layer.render(screen)                                # every frame, under the particles
+#   layer.clear()                                       # trails off / reset
+
+
+class TrailLayer:
+
+    def __init__(self, size=(SW, SH), style=TRAIL_STYLE, length=TRAIL_LENGTH, skip=TRAIL_SKIP):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, 0))
+        self.style = style
+        self.skip = skip
+        # per-stamp alpha step: a stamp fades from 230 to 40 over `length` stamps, like the oldest ->
+        # newest ramp of the history trails, and is gone a few stamps later (RGB is left alone)
+        step = max(1, round((230 - 40) / max(1, length)))
+        self._fader = pygame.Surface(size, pygame.SRCALPHA)
+        self._fader.fill((0, 0, 0, step))
+        self._frame = 0
+        self._last = None        # (N, 2) int positions of the previous stamp (polyline)
+        self._members = []
+        # areas of the stamps that haven't faded out yet (a stamp is gone after 230 / step fades)
+        self._recent = deque(maxlen=math.ceil(230 / step))
+        self._bounds = None      # union of _recent: what gets faded / blitted
+
+    def clear(self):
+        self.surface.fill((0, 0, 0, 0))
+        self._frame = 0
+        self._last = None
+        self._members = []
+        self._recent.clear()
+        self._bounds = None
+
+    def record(self, charges, positions):
+        """Stamp every particle at `positions` ((N, 2), same order as `charges`) every `skip` calls."""
+        self._frame += 1
+        if self._frame % self.skip or not charges:
+            return
+        surf = self.surface
+        if self._bounds is not None:
+            surf.blit(self._fader, self._bounds.topleft, self._bounds, special_flags=pygame.BLEND_RGBA_SUB)
+
+        points = positions.astype(int).tolist()
+        if charges != self._members:
+            self._members = list(charges)
+            self._last = None  # membership changed: no segment back to someone else's stamp
+        drawn = []
+        if self.style == "polyline":
+            if self._last is None:
+                self._last = points  # first stamp: nothing to join yet
+                return
+            for pc, p, q in zip(charges, points, self._last):
+                c = pc.color
+                drawn.append(pygame.draw.line(surf, (c[0], c[1], c[2], 230), q, p, TRAIL_LINE_WIDTH))
+        else:
+            for pc, p in zip(charges, points):
+                c = pc.color
+                drawn.append(pygame.draw.circle(surf, (c[0], c[1], c[2], 230), p, max(1, int(pc.core_radius))))
+        self._last = points
+
+        self._recent.append(drawn[0].unionall(drawn[1:]).clip(surf.get_rect()))
+        # older stamps are fully transparent by now: the bounds follow the particles instead of
+        # growing to the whole screen
+        self._bounds = self._recent[0].unionall(list(self._recent)[1:])
+
+    def render(self, screen, stride=1):
+        # stride (busy frames) doesn't matter here: it's one blit either way
+        if self._bounds is not None:
+            screen.blit(self.surface, self._bounds.topleft, self._bounds)
+
+
+# History trails ("history").
+# Every particle's last `length` stamps live in one preallocated (capacity, length, 2) float32 ring
+# buffer, rows in the same order as the particle list / ParticleStore. All rows share one write
+# column, so a stamp is a single array assignment from the store positions (no per-particle deque of
+# copied arrays). Drawing walks each trail back from its newest point and only keeps a point every
+# `lod_px` pixels of arc length (times the scheduler's stride on busy frames, and coarser still when
+# the whole system would need more than `max_points`), so trails thousands of points long cost what
+# their on-screen length needs, not what they hold. That work is only redone when a stamp lands;
+# frames in between (and setup / pause) just blit the last drawing.
+#
+#   history.record(all_point_charges, store.positions)   # while running
+#   history.render(screen, stride)                        # every frame, under the particles
+#   history.clear()                                       # trails off / reset
+#
+#   older, newer = history.segments()    # zero-copy views for analysis / export: concatenated along
+#                                        # axis 1 they are every row oldest -> newest; the first
+#                                        # length - counts[i] entries of row i are unused
+
+
+class TrailHistory:
+
+    def __init__(self, size=(SW, SH), style=TRAIL_STYLE, length=TRAIL_HISTORY_LENGTH, skip=TRAIL_SKIP,
+                 lod_px=TRAIL_LOD_PX, max_points=TRAIL_MAX_POINTS, capacity=64):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)   # scratch the trails are drawn into
+        self.surface.fill((0, 0, 0, 0))
+        self.style = style
+        self.length = length
+        self.skip = skip
+        self.lod_px = lod_px
+        self.max_points = max_points
+        self.data = np.zeros((capacity, length, 2), dtype=np.float32)
+        self.counts = np.zeros(capacity, dtype=np.int64)    # stamps held by each row (<= length)
+        self.head = 0                                       # column the next stamp goes into
+        self._frame = 0
+        self._members = []
+        self._version = 0        # bumped by every stamp / clear / rebind
+        self._drawn_key = None   # (version, stride, looks) the scratch was last drawn for
+        self._bounds = None      # what is drawn in the scratch
+
+    def __len__(self):
+        return len(self._members)
+
+    def clear(self):
+        self.counts[:] = 0
+        self.head = 0
+        self._frame = 0
+        self._version += 1
+
+    def segments(self):
+        """(older, newer): zero-copy views of the live rows, oldest -> newest when joined on axis 1."""
+        n = len(self._members)
+        return self.data[:n, self.head:], self.data[:n, :self.head]
+
+    def _rebind(self, charges):
+        # rows follow the particle list: particles that stay keep their history, new ones start empty
+        old = {id(pc): i for i, pc in enumerate(self._members)}
+        rows = [old.get(id(pc), -1) for pc in charges]
+        capacity = len(self.data)
+        if len(charges) > capacity:
+            capacity = 1 << (len(charges) - 1).bit_length()
+        data = np.zeros((capacity,) + self.data.shape[1:], dtype=self.data.dtype)
+        counts = np.zeros(capacity, dtype=np.int64)
+        for new, i in enumerate(rows):
+            if i >= 0:
+                data[new] = self.data[i]
+                counts[new] = self.counts[i]
+        self.data = data
+        self.counts = counts
+        self._members = list(charges)
+        self._version += 1
+
+    def record(self, charges, positions):
+        """Stamp every particle at `positions` ((N, 2), same order as `charges`) every `skip` calls."""
+        self._frame += 1
+        if self._frame % self.skip or not charges:
+            return
+        if charges != self._members:
+            self._rebind(charges)
+        n = len(charges)
+        self.data[:n, self.head] = positions
+        np.minimum(self.counts[:n] + 1, self.length, out=self.counts[:n])
+        self.head = (self.head + 1) % self.length
+        self._version += 1
+
+    def _decimate(self, step_px):
+        """
+        Level-of-detail selection over the live rows. `step_px` is the spacing along the trail, one
+        value or one per row, widened if needed to keep about `max_points` points in total.
+        Returns (rows, points, age) of the kept points, row by row and oldest -> newest within a
+        row; age runs from 0 (newest) to 1 (oldest stamp the row holds).
+        """
+        n = len(self._members)
+        counts = self.counts[:n]
+        m = int(counts.max())
+        pts = np.concatenate(self.segments(), axis=1)[:, self.length - m:]   # (n, m, 2) oldest -> newest
+        valid = np.arange(m)[None, :] >= (m - counts)[:, None]
+
+        # arc length from every point to the newest one, bucketed by the step: a point is kept when
+        # the next (newer) point falls in another bucket, plus the newest point itself
+        step = np.hypot(*(pts[:, 1:] - pts[:, :-1]).transpose(2, 0, 1))
+        step *= valid[:, :-1]
+        back = np.zeros((n, m), dtype=step.dtype)
+        back[:, :-1] = np.cumsum(step[:, ::-1], axis=1)[:, ::-1]
+        # very long trails everywhere: widen the step until the whole system fits the point budget
+        step_px = np.maximum(step_px, back[:, 0].sum() / self.max_points)
+        bucket = (back * np.reshape(1.0 / step_px, (-1, 1))).astype(np.int32)
+        keep = np.ones((n, m), dtype=bool)
+        keep[:, :-1] = bucket[:, :-1] != bucket[:, 1:]
+        keep &= valid
+
+        rows, ks = np.nonzero(keep)
+        age = (m - 1 - ks) / np.maximum(counts[rows] - 1, 1)
+        return rows, pts[rows, ks], np.minimum(age, 1.0)
+
+    def render(self, screen, stride=1):
+        # the trails only change when a stamp lands (every `skip` frames while running), so the
+        # decimation and drawing happen then and every other frame is one blit of the scratch
+        looks = [(pc.color, pc.core_radius) for pc in self._members]
+        key = (self._version, stride, looks)
+        if key != self._drawn_key:
+            self._drawn_key = key
+            self._redraw(stride)
+        if self._bounds is not None:
+            screen.blit(self.surface, self._bounds.topleft, self._bounds)
+
+    def _redraw(self, stride):
+        surf = self.surface
+        if self._bounds is not None:
+            surf.fill((0, 0, 0, 0), self._bounds)
+            self._bounds = None
+        if not self._members or not self.counts[:len(self._members)].any():
+            return
+
+        step_px = self.lod_px * stride
+        if self.style != "polyline":
+            # discs closer than their radius only overdraw each other
+            step_px = np.maximum(step_px, [pc.core_radius for pc in self._members])
+        rows, points, age = self._decimate(step_px)
+        colours = [pc.color for pc in self._members]
+        xy = points.astype(int).tolist()
+        drawn = []
+
+        if self.style == "polyline":
+            # one line per (particle, alpha band) run instead of per segment; a run ends on the next
+            # run's first point (same particle) so the line stays continuous
+            bands = TRAIL_FADE_BANDS
+            band = np.minimum((age * bands).astype(int), bands - 1)
+            cuts = np.flatnonzero((band[1:] != band[:-1]) | (rows[1:] != rows[:-1])) + 1
+            starts = [0, *cuts.tolist()]
+            ends = [*cuts.tolist(), len(rows)]
+            same = (rows[cuts] == rows[cuts - 1]).tolist() + [False]
+            row_of = rows[starts].tolist()
+            band_of = band[starts].tolist()
+            for a, b, joined, r, k in zip(starts, ends, same, row_of, band_of):
+                if joined:
+                    b += 1
+                if b - a < 2:
+                    continue
+                c = colours[r]
+                # alpha 40 (oldest) -> 230 (newest), at the middle of the band
+                colour = (c[0], c[1], c[2], int(230 - 190 * (k + 0.5) / bands))
+                drawn.append(pygame.draw.lines(surf, colour, False, xy[a:b], TRAIL_LINE_WIDTH))
+        else:
+            alpha = (230 - 190 * age).astype(int).tolist()
+            radius = [max(1, int(pc.core_radius)) for pc in self._members]
+            for r, p, a in zip(rows.tolist(), xy, alpha):
+                c = colours[r]
+                drawn.append(pygame.draw.circle(surf, (c[0], c[1], c[2], a), p, radius[r]))
+
+        if drawn:
+            self._bounds = drawn[0].unionall(drawn[1:]).clip(surf.get_rect())